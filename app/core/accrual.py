@@ -0,0 +1,148 @@
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import select, update, func, case
+from sqlalchemy.orm import Session
+from ..models import FixedIncome as FixedIncomeModel, FixedExpense as FixedExpenseModel, UserMoney as UserMoneyModel, UserFinancialSummary as SummaryModel
+from . import versions
+
+logger = logging.getLogger(__name__)
+
+ACCRUAL_CHUNK_SIZE = int(os.getenv("ACCRUAL_CHUNK_SIZE", "500"))
+
+# (modelo, signo) de cada flujo fijo que se aplica sobre user_money
+FLOWS = (
+    (FixedIncomeModel, 1),
+    (FixedExpenseModel, -1),
+)
+
+def periods_due(now: datetime, updated_at: datetime, frequency: int) -> int:
+    days = (now - updated_at).days
+    if frequency <= 0:
+        return 1 if days >= frequency else 0
+    return days // frequency
+
+def next_updated_at(now: datetime, updated_at: datetime, frequency: int, periods: int) -> datetime:
+    # Se avanza un número entero de periodos para no perder el día de cobro/pago
+    if frequency <= 0:
+        return now
+    return updated_at + timedelta(days=frequency * periods)
+
+def collect_due(db: Session, now: datetime) -> dict:
+    due = {}
+    for model, sign in FLOWS:
+        pk = model.__mapper__.primary_key[0]
+        rows = db.execute(
+            select(pk, model.user_id, model.frequency, model.updated_at)
+            .where(model.status == "active")
+        )
+        for row_id, user_id, frequency, updated_at in rows:
+            periods = periods_due(now, updated_at, frequency)
+            if periods <= 0:
+                continue
+            entry = due.setdefault(user_id, {m: [] for m, _ in FLOWS})
+            entry[model].append((row_id, updated_at, next_updated_at(now, updated_at, frequency, periods), periods))
+    return due
+
+def money_rows_for(db: Session, user_ids: list) -> dict:
+    # Equivalente a .first() por usuario: la fila de user_money con menor id
+    rows = db.execute(
+        select(UserMoneyModel.user_id, func.min(UserMoneyModel.user_money_id))
+        .where(UserMoneyModel.user_id.in_(user_ids))
+        .group_by(UserMoneyModel.user_id)
+    )
+    return {user_id: user_money_id for user_id, user_money_id in rows}
+
+def advance_rows(db: Session, model, sign: int, rows: list, deltas: dict) -> int:
+    # Se bloquean y releen las filas: las que el usuario editó entre la lectura inicial y
+    # esta transacción (updated_at distinto) no se cobran ni se avanzan. El UPDATE es uno
+    # por lote, con CASE sobre el id, y mantiene la misma condición sobre updated_at.
+    table = model.__table__
+    pk = table.c[model.__mapper__.primary_key[0].name]
+    pending = {row_id: (old, new, periods) for row_id, old, new, periods in rows}
+    current = db.execute(
+        select(pk, table.c.user_id, table.c.amount, table.c.updated_at)
+        .where(pk.in_(list(pending)), table.c.status == "active")
+        .with_for_update()
+    ).all()
+    moved = [(row_id, user_id, amount) for row_id, user_id, amount, updated_at in current if updated_at == pending[row_id][0]]
+    if not moved:
+        return 0
+    ids = [row_id for row_id, _, _ in moved]
+    db.execute(
+        update(table)
+        .where(pk.in_(ids), table.c.updated_at == case({row_id: pending[row_id][0] for row_id in ids}, value=pk))
+        .values(updated_at=case({row_id: pending[row_id][1] for row_id in ids}, value=pk))
+    )
+    for row_id, user_id, amount in moved:
+        deltas[user_id] = deltas.get(user_id, Decimal("0")) + sign * Decimal(amount) * pending[row_id][2]
+    # updated_at avanza a old + k·frequency, que puede quedar por debajo del máximo del usuario
+    versions.bump(db, {user_id for _, user_id, _ in moved}, model.__tablename__)
+    return len(moved)
+
+def apply_chunk(db: Session, due: dict, user_ids: list, now: datetime, report: dict, chunk_size: int = ACCRUAL_CHUNK_SIZE):
+    money_ids = money_rows_for(db, user_ids)
+    if not money_ids:
+        return
+
+    deltas = {}
+    for model, sign in FLOWS:
+        rows = [row for user_id in user_ids if user_id in money_ids for row in due[user_id][model]]
+        for start in range(0, len(rows), chunk_size):
+            report[f"{model.__tablename__}_rows"] += advance_rows(db, model, sign, rows[start:start + chunk_size], deltas)
+    if not deltas:
+        return
+
+    money_table = UserMoneyModel.__table__
+    money_deltas = {money_ids[user_id]: delta for user_id, delta in deltas.items()}
+    db.execute(
+        update(money_table)
+        .where(money_table.c.user_money_id.in_(list(money_deltas)))
+        .values(amount=money_table.c.amount + case(money_deltas, value=money_table.c.user_money_id), updated_at=now)
+    )
+    report["user_money_rows"] += len(money_deltas)
+    versions.bump(db, deltas, UserMoneyModel.__tablename__)
+
+    # El saldo del resumen solo refleja filas de user_money activas
+    active_ids = set(db.execute(
+        select(UserMoneyModel.user_money_id)
+        .where(UserMoneyModel.user_money_id.in_(list(money_deltas)), UserMoneyModel.status == "active")
+    ).scalars())
+    summary_deltas = {
+        user_id: delta for user_id, delta in deltas.items()
+        if money_ids[user_id] in active_ids and delta
+    }
+    if summary_deltas:
+        summary_table = SummaryModel.__table__
+        db.execute(
+            update(summary_table)
+            .where(summary_table.c.user_id.in_(list(summary_deltas)))
+            .values(balance=summary_table.c.balance + case(summary_deltas, value=summary_table.c.user_id), updated_at=now)
+        )
+
+def run_accrual(db: Session, now: datetime | None = None, chunk_size: int = ACCRUAL_CHUNK_SIZE) -> dict:
+    started = time.perf_counter()
+    now = now or datetime.utcnow()
+    report = {"users_due": 0, "user_money_rows": 0}
+    for model, _ in FLOWS:
+        report[f"{model.__tablename__}_rows"] = 0
+
+    due = collect_due(db, now)
+    report["users_due"] = len(due)
+    db.rollback()  # libera el snapshot de lectura antes de escribir
+
+    user_ids = sorted(due)
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        try:
+            apply_chunk(db, due, chunk, now, report, chunk_size)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    report["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    logger.info("Fixed incomes/expenses accrual: %s", report)
+    return report
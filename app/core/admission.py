@@ -0,0 +1,66 @@
+import os
+import threading
+from fastapi import HTTPException, status
+
+# Control de admisión por proceso: cada ruta cara ocupa `cost` unidades de una capacidad
+# común mientras se atiende. Si no caben, se rechaza al momento con 503 y Retry-After
+# en lugar de encolar trabajo que saturaría el worker.
+
+ADMISSION_CAPACITY = int(os.getenv("ADMISSION_CAPACITY", "32"))
+ADMISSION_RETRY_AFTER_SECONDS = os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "1")
+
+COST_BCRYPT = int(os.getenv("ADMISSION_COST_BCRYPT", "8"))
+COST_CASCADE = int(os.getenv("ADMISSION_COST_CASCADE", "16"))
+COST_ANALYSIS = int(os.getenv("ADMISSION_COST_ANALYSIS", "4"))
+COST_PROJECTION = int(os.getenv("ADMISSION_COST_PROJECTION", "8"))
+
+class AdmissionController:
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.in_use = 0
+        self.routes = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, route: str, cost: int) -> bool:
+        with self._lock:
+            stats = self.routes.setdefault(route, {"cost": cost, "in_flight": 0, "admitted": 0, "rejected": 0})
+            # Una ruta más cara que la capacidad entra solo con el worker libre
+            if self.capacity > 0 and self.in_use + cost > self.capacity and self.in_use > 0:
+                stats["rejected"] += 1
+                return False
+            self.in_use += cost
+            stats["in_flight"] += 1
+            stats["admitted"] += 1
+            return True
+
+    def release(self, route: str, cost: int):
+        with self._lock:
+            self.in_use -= cost
+            self.routes[route]["in_flight"] -= 1
+
+    def status(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "in_use": self.in_use,
+                "routes": {route: dict(stats) for route, stats in self.routes.items()},
+            }
+
+controller = AdmissionController(ADMISSION_CAPACITY)
+
+def admit(route: str, cost: int):
+    # Dependencia de ruta (dependencies=[Depends(admit(...))]): se resuelve antes que la
+    # autenticación y la sesión, así el rechazo no toca la base de datos.
+    # ADMISSION_CAPACITY=0 desactiva el límite pero mantiene los contadores.
+    async def dependency():
+        if not controller.try_acquire(route, cost):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="err_server_busy",
+                headers={"Retry-After": ADMISSION_RETRY_AFTER_SECONDS},
+            )
+        try:
+            yield
+        finally:
+            controller.release(route, cost)
+    return dependency
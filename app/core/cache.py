@@ -0,0 +1,79 @@
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    # Cache LRU en memoria del proceso con expiración por entrada. Con maxbytes y sizeof
+    # se limita además el tamaño total de los valores (p. ej. arrays de numpy).
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, maxbytes: int = 0, sizeof=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+            expires_at, value, _ = item
+            if expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        size = self.sizeof(value) if self.sizeof is not None else 0
+        if self.maxbytes and size > self.maxbytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (time.monotonic() + self.ttl, value, size)
+            self.bytes += size
+            while len(self._data) > self.maxsize or (self.maxbytes and self.bytes > self.maxbytes):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def _remove(self, key):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self.bytes -= item[2]
+        return item
+
+    def pop(self, key):
+        with self._lock:
+            item = self._remove(key)
+        return item[1] if item else None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = len(self._data)
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": size,
+            "maxsize": self.maxsize,
+            "bytes": self.bytes,
+            "maxbytes": self.maxbytes,
+            "ttl_seconds": self.ttl,
+        }
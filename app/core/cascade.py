@@ -0,0 +1,113 @@
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models import (
+    User as UserModel, FixedIncome as FixedIncomeModel, VariableIncome as VariableIncomeModel,
+    FixedExpense as FixedExpenseModel, VariableExpense as VariableExpenseModel, Saving as SavingModel,
+    Debt as DebtModel, Goal as GoalModel, FixedInvestment as FixedInvestmentModel,
+    VariableInvestment as VariableInvestmentModel, UserMoney as UserMoneyModel, AdminJob as AdminJobModel,
+)
+from .summary import refresh_user as refresh_summary
+from .moments import refresh_user as refresh_moments
+from . import versions
+
+logger = logging.getLogger(__name__)
+
+# Por encima de este número de filas la cascada se hace en un job en segundo plano
+ADMIN_CASCADE_BACKGROUND_ROWS = int(os.getenv("ADMIN_CASCADE_BACKGROUND_ROWS", "50000"))
+# Un job pendiente o en curso más antiguo que esto se da por perdido (reinicio o caída del
+# worker que lo ejecutaba) y deja de bloquear nuevas cascadas del usuario
+ADMIN_JOB_STALE_SECONDS = int(os.getenv("ADMIN_JOB_STALE_SECONDS", "3600"))
+
+CASCADE_MODELS = (
+    FixedIncomeModel, VariableIncomeModel, FixedExpenseModel, VariableExpenseModel, SavingModel,
+    DebtModel, GoalModel, FixedInvestmentModel, VariableInvestmentModel, UserMoneyModel,
+)
+
+# Estado del usuario y de sus registros según la operación
+KINDS = {"delete_user": "inactive", "reactivate_user": "active"}
+
+def exceeds_background_rows(db: Session, user_id: int) -> bool:
+    # Una sola consulta; cada tabla cuenta como mucho hasta pasar el umbral
+    counts = [
+        select(func.count()).select_from(
+            select(model.user_id).where(model.user_id == user_id).limit(ADMIN_CASCADE_BACKGROUND_ROWS + 1).subquery()
+        ).scalar_subquery()
+        for model in CASCADE_MODELS
+    ]
+    return db.execute(select(sum(counts[1:], counts[0]))).scalar() > ADMIN_CASCADE_BACKGROUND_ROWS
+
+def set_user_status(db: Session, user_id: int, status: str):
+    # Un UPDATE por tabla; el commit lo hace quien llama, todo en una transacción
+    now = datetime.utcnow()
+    for model in CASCADE_MODELS:
+        db.execute(
+            update(model)
+            .where(model.user_id == user_id)
+            .values(status=status, updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    db.execute(
+        update(UserModel)
+        .where(UserModel.user_id == user_id)
+        .values(status=status, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    refresh_summary(db, user_id)
+    refresh_moments(db, user_id)
+    versions.bump(db, [user_id], *(model.__tablename__ for model in CASCADE_MODELS))
+
+def expire_stale_jobs(db: Session, user_id: int):
+    cutoff = datetime.utcnow() - timedelta(seconds=ADMIN_JOB_STALE_SECONDS)
+    result = db.execute(
+        update(AdminJobModel)
+        .where(
+            AdminJobModel.user_id == user_id,
+            ((AdminJobModel.status == "pending") & (AdminJobModel.created_at < cutoff))
+            | ((AdminJobModel.status == "running") & (AdminJobModel.started_at < cutoff)),
+        )
+        .values(status="failed", error="err_job_stale", finished_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        db.commit()
+
+def active_job(db: Session, user_id: int):
+    expire_stale_jobs(db, user_id)
+    return db.query(AdminJobModel).filter(
+        AdminJobModel.user_id == user_id, AdminJobModel.status.in_(("pending", "running"))
+    ).first()
+
+def create_job(db: Session, kind: str, user_id: int):
+    job = AdminJobModel(job_id=uuid.uuid4().hex, kind=kind, user_id=user_id, status="pending", created_at=datetime.utcnow())
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def update_job(db: Session, job_id: str, **values):
+    db.execute(update(AdminJobModel).where(AdminJobModel.job_id == job_id).values(**values))
+    db.commit()
+
+def run_job(job_id: str, kind: str, user_id: int, on_done=None):
+    # Sesión propia: se ejecuta después de enviar la respuesta
+    db = SessionLocal()
+    try:
+        update_job(db, job_id, status="running", started_at=datetime.utcnow())
+        try:
+            set_user_status(db, user_id, KINDS[kind])
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Admin job %s (%s user %s) failed", job_id, kind, user_id)
+            update_job(db, job_id, status="failed", error=str(exc)[:1024], finished_at=datetime.utcnow())
+            return
+        update_job(db, job_id, status="done", finished_at=datetime.utcnow())
+        if on_done is not None:
+            on_done()
+    finally:
+        db.close()
@@ -0,0 +1,192 @@
+import os
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models import Debt as DebtModel
+
+# Proyección mes a mes del pago de deudas. Todas las deudas (de uno o de muchos
+# usuarios) se simulan a la vez con arrays de NumPy; numpy se importa al usarse
+# para no cargarlo en el arranque de los workers.
+
+DEBT_PROJECTION_MAX_MONTHS = int(os.getenv("DEBT_PROJECTION_MAX_MONTHS", "600"))
+DEBT_PROJECTION_CHUNK_USERS = int(os.getenv("DEBT_PROJECTION_CHUNK_USERS", "1000"))
+
+DAYS_PER_MONTH = 30
+PAID_EPSILON = 0.005
+COMPACT_MONTHS = 12
+STRATEGIES = ("snowball", "avalanche")
+
+DEBT_COLUMNS = (
+    DebtModel.debt_id, DebtModel.user_id, DebtModel.name, DebtModel.amount, DebtModel.payment,
+    DebtModel.interest_rate, DebtModel.interest_type, DebtModel.interest_period_days, DebtModel.interest_free_months,
+)
+
+def load_debts(db: Session, user_ids: list | None = None) -> list:
+    stmt = select(*DEBT_COLUMNS).where(DebtModel.status == "active")
+    if user_ids is not None:
+        stmt = stmt.where(DebtModel.user_id.in_(user_ids))
+    return db.execute(stmt.order_by(DebtModel.user_id, DebtModel.debt_id)).all()
+
+def to_arrays(rows: list) -> dict:
+    import numpy as np
+
+    rate = np.array([float(row.interest_rate) for row in rows]) / 100
+    period = np.maximum(np.array([row.interest_period_days for row in rows], dtype=float), 1)
+    simple = np.array([row.interest_type == "simple" for row in rows], dtype=bool)
+    return {
+        "debt_id": np.array([row.debt_id for row in rows], dtype=np.int64),
+        "user_id": np.array([row.user_id for row in rows], dtype=np.int64),
+        "amount": np.array([float(row.amount) for row in rows]),
+        "payment": np.array([float(row.payment) for row in rows]),
+        "free_months": np.array([row.interest_free_months for row in rows], dtype=np.int64),
+        "simple": simple,
+        # Tasa por periodo de interest_period_days llevada a un mes de 30 días:
+        # simple -> sobre el capital inicial, compuesto -> sobre el saldo
+        "monthly_rate": np.where(simple, rate * DAYS_PER_MONTH / period, (1 + rate) ** (DAYS_PER_MONTH / period) - 1),
+    }
+
+def simulate(debts: dict, strategy: str, max_months: int = DEBT_PROJECTION_MAX_MONTHS, schedule: bool = False) -> dict:
+    import numpy as np
+
+    # Orden de prioridad dentro de cada usuario: snowball = menor saldo primero,
+    # avalanche = mayor tasa primero; el pago que libera una deuda saldada pasa a la siguiente
+    key = debts["amount"] if strategy == "snowball" else -debts["monthly_rate"]
+    order = np.lexsort((debts["debt_id"], key, debts["user_id"]))
+    users = debts["user_id"][order]
+    principal = debts["amount"][order]
+    payment = debts["payment"][order]
+    free_months = debts["free_months"][order]
+    simple = debts["simple"][order]
+    monthly_rate = debts["monthly_rate"][order]
+
+    user_ids, group = np.unique(users, return_inverse=True)
+    count = len(user_ids)
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+    budget = np.bincount(group, weights=payment, minlength=count)
+
+    balance = principal.copy()
+    interest = np.zeros(len(balance))
+    paid = np.zeros(len(balance))
+    payoff_month = np.full(len(balance), -1, dtype=np.int64)
+    payoff_month[balance <= PAID_EPSILON] = 0
+    balance[balance <= PAID_EPSILON] = 0
+    series = []
+
+    live = np.arange(0)
+    live_balance, live_interest, live_paid, live_payoff = balance[live], interest[live], paid[live], payoff_month[live]
+    for month in range(max_months):
+        if month % COMPACT_MONTHS == 0:
+            # Cada cierto número de meses se descartan los usuarios sin deudas abiertas:
+            # el bucle solo recorre lo que queda por pagar
+            balance[live], interest[live], paid[live], payoff_month[live] = live_balance, live_interest, live_paid, live_payoff
+            live = np.flatnonzero((np.bincount(group, weights=balance > 0, minlength=count) > 0)[group])
+            if not len(live):
+                break
+            live_balance, live_interest, live_paid, live_payoff = balance[live], interest[live], paid[live], payoff_month[live]
+            live_principal, live_payment, live_free = principal[live], payment[live], free_months[live]
+            live_simple, live_rate, live_users = simple[live], monthly_rate[live], group[live]
+            live_ids, live_group = np.unique(live_users, return_inverse=True)
+            live_starts = np.flatnonzero(np.r_[True, live_group[1:] != live_group[:-1]])
+            live_budget = budget[live_ids]
+
+        open_debts = live_balance > 0
+        charged = np.where(live_simple, live_principal * live_rate, live_balance * live_rate)
+        charged = np.where((month >= live_free) & open_debts, charged, 0.0)
+        live_balance += charged
+        live_interest += charged
+
+        minimum = np.minimum(live_payment, live_balance)
+        extra = live_budget - np.bincount(live_group, weights=minimum, minlength=len(live_ids))
+        remaining = live_balance - minimum
+        # Cumsum por grupo: lo que ya absorben las deudas anteriores del mismo usuario
+        before = np.cumsum(remaining) - remaining
+        before -= before[live_starts][live_group]
+        allocated = np.clip(extra[live_group] - before, 0, remaining)
+
+        payment_made = minimum + allocated
+        live_balance -= payment_made
+        live_paid += payment_made
+        settled = open_debts & (live_balance <= PAID_EPSILON)
+        live_payoff[settled] = month + 1
+        live_balance[live_balance <= PAID_EPSILON] = 0
+        if schedule:
+            series.append(np.bincount(live_users, weights=live_balance, minlength=count))
+    else:
+        balance[live], interest[live], paid[live], payoff_month[live] = live_balance, live_interest, live_paid, live_payoff
+
+    unpaid = np.bincount(group, weights=(payoff_month < 0), minlength=count) > 0
+    months = np.zeros(count, dtype=np.int64)
+    np.maximum.at(months, group, payoff_month)
+    restore = np.empty_like(order)
+    restore[order] = np.arange(len(order))
+    return {
+        "user_id": user_ids,
+        "months_to_payoff": np.where(unpaid, -1, months),
+        "total_interest": np.bincount(group, weights=interest, minlength=count),
+        "total_paid": np.bincount(group, weights=paid, minlength=count),
+        "remaining_balance": np.bincount(group, weights=balance, minlength=count),
+        "payoff_month": payoff_month[restore],
+        "schedule": np.array(series).T if schedule else None,
+    }
+
+def project(rows: list, max_months: int = DEBT_PROJECTION_MAX_MONTHS, schedule: bool = False) -> list:
+    if not rows:
+        return []
+    debts = to_arrays(rows)
+    results = {strategy: simulate(debts, strategy, max_months, schedule) for strategy in STRATEGIES}
+    user_ids = results[STRATEGIES[0]]["user_id"]
+    by_user = {int(user_id): {"user_id": int(user_id), "debts": [], "strategies": {}} for user_id in user_ids}
+
+    for index, row in enumerate(rows):
+        by_user[row.user_id]["debts"].append({
+            "debt_id": row.debt_id,
+            "name": row.name,
+            "amount": float(row.amount),
+            **{f"{strategy}_payoff_month": none_if_unpaid(results[strategy]["payoff_month"][index]) for strategy in STRATEGIES},
+        })
+    for strategy, result in results.items():
+        for position, user_id in enumerate(user_ids):
+            projection = {
+                "months_to_payoff": none_if_unpaid(result["months_to_payoff"][position]),
+                "total_interest": round(float(result["total_interest"][position]), 2),
+                "total_paid": round(float(result["total_paid"][position]), 2),
+                "remaining_balance": round(float(result["remaining_balance"][position]), 2),
+            }
+            if schedule:
+                projection["balances"] = [round(float(value), 2) for value in result["schedule"][position]]
+            by_user[int(user_id)]["strategies"][strategy] = projection
+    for projection in by_user.values():
+        projection["recommended"] = recommended(projection["strategies"])
+    return list(by_user.values())
+
+def none_if_unpaid(month) -> int | None:
+    return None if month < 0 else int(month)
+
+def recommended(strategies: dict) -> str:
+    # Menos intereses; a igualdad, antes libre de deudas (las no saldadas van al final)
+    def cost(strategy):
+        result = strategies[strategy]
+        return result["total_interest"], result["remaining_balance"], result["months_to_payoff"] is None, result["months_to_payoff"] or 0
+    return min(STRATEGIES, key=cost)
+
+def project_user(db: Session, user_id: int, max_months: int = DEBT_PROJECTION_MAX_MONTHS, schedule: bool = False) -> dict:
+    projections = project(load_debts(db, [user_id]), max_months, schedule)
+    if projections:
+        return projections[0]
+    return {"user_id": user_id, "debts": [], "strategies": {}, "recommended": None}
+
+def project_all(db: Session, chunk_users: int = DEBT_PROJECTION_CHUNK_USERS, max_months: int = DEBT_PROJECTION_MAX_MONTHS):
+    # Modo batch: usuarios con deudas activas por bloques (keyset sobre user_id),
+    # una simulación vectorizada por bloque
+    last_user_id = 0
+    while True:
+        user_ids = db.execute(
+            select(DebtModel.user_id)
+            .where(DebtModel.status == "active", DebtModel.user_id > last_user_id)
+            .group_by(DebtModel.user_id)
+            .order_by(DebtModel.user_id)
+            .limit(chunk_users)
+        ).scalars().all()
+        if not user_ids:
+            return
+        yield project(load_debts(db, user_ids), max_months)
+        last_user_id = user_ids[-1]
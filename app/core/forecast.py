@@ -0,0 +1,236 @@
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models import (
+    FixedIncome as FixedIncomeModel, FixedExpense as FixedExpenseModel, VariableIncome as VariableIncomeModel,
+    VariableExpense as VariableExpenseModel, UserMoney as UserMoneyModel,
+)
+from .cache import TTLCache
+
+# Previsión Monte Carlo del saldo: flujos fijos según su calendario (frequency en días
+# desde updated_at, como en accrual) y flujos variables muestreados del historial:
+# número de movimientos por día ~ Poisson con la tasa observada, importes re-muestreados.
+# Cada lote de simulaciones es una matriz (simulaciones x días) de NumPy que el propio
+# lote reduce a un histograma por punto y a recuentos de saldos negativos; solo eso sale
+# del lote, así la memoria no crece con el número de simulaciones. Con muchas
+# simulaciones los lotes se reparten en un pool de procesos. Cada lote tiene su propia
+# semilla derivada de la pedida, así el resultado no depende de dónde se ejecute.
+
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", "2"))
+FORECAST_BATCH_SIMULATIONS = int(os.getenv("FORECAST_BATCH_SIMULATIONS", "1000"))
+FORECAST_MAX_SIMULATIONS = int(os.getenv("FORECAST_MAX_SIMULATIONS", "100000"))
+# Límite de celdas simuladas (simulaciones x días) por petición
+FORECAST_MAX_CELLS = int(os.getenv("FORECAST_MAX_CELLS", "50000000"))
+FORECAST_HISTOGRAM_BINS = int(os.getenv("FORECAST_HISTOGRAM_BINS", "512"))
+# Eventos de flujos variables generados a la vez dentro de un lote
+FORECAST_BATCH_EVENTS = int(os.getenv("FORECAST_BATCH_EVENTS", "1000000"))
+FORECAST_HISTORY_DAYS = int(os.getenv("FORECAST_HISTORY_DAYS", "365"))
+FORECAST_CACHE_TTL_SECONDS = float(os.getenv("FORECAST_CACHE_TTL_SECONDS", "3600"))
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "1000"))
+
+PERCENTILES = (5, 25, 50, 75, 95)
+MIN_HISTORY_DAYS = 30
+# Histograma por punto sobre media ± 6 desviaciones: por Chebyshev fuera queda como mucho
+# 1/36 (< 5 %) de las simulaciones, así p5..p95 siempre caen dentro del rango
+HISTOGRAM_SIGMAS = 6
+
+# (modelo, columna de fecha, signo) de cada flujo variable
+VARIABLE_FLOWS = (
+    (VariableIncomeModel, VariableIncomeModel.received_date, 1),
+    (VariableExpenseModel, VariableExpenseModel.paid_date, -1),
+)
+
+# Clave: (user_id, huella de las entradas y parámetros); cualquier cambio de datos cambia la huella
+forecast_cache = TTLCache(maxsize=FORECAST_CACHE_MAX_ENTRIES, ttl=FORECAST_CACHE_TTL_SECONDS)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=FORECAST_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+def shutdown_forecast_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+def as_date(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.date() if isinstance(value, datetime) else value
+
+def load_inputs(db: Session, user_id: int, today) -> dict:
+    money = db.execute(
+        select(UserMoneyModel.amount)
+        .where(UserMoneyModel.user_id == user_id, UserMoneyModel.status == "active")
+        .order_by(UserMoneyModel.user_money_id)
+        .limit(1)
+    ).scalar()
+
+    fixed = []
+    for model, sign in ((FixedIncomeModel, 1), (FixedExpenseModel, -1)):
+        rows = db.execute(
+            select(model.amount, model.frequency, model.updated_at)
+            .where(model.user_id == user_id, model.status == "active", model.frequency > 0)
+        )
+        for amount, frequency, updated_at in rows:
+            # Días hasta el próximo cobro/pago: el acumulador aplica un periodo cada `frequency` días desde updated_at
+            elapsed = (today - as_date(updated_at)).days
+            fixed.append((sign * float(amount), frequency, max(frequency - elapsed, 1)))
+
+    since = today - timedelta(days=FORECAST_HISTORY_DAYS)
+    variable = []
+    for model, date_column, sign in VARIABLE_FLOWS:
+        rows = db.execute(
+            select(model.amount, date_column)
+            .where(model.user_id == user_id, model.status == "active", date_column >= since, date_column <= today)
+        ).all()
+        dates = [as_date(row[1]) for row in rows]
+        span = max((today - min(dates)).days if dates else 0, MIN_HISTORY_DAYS)
+        variable.append((sign, len(rows) / span, sorted(float(row[0]) for row in rows)))
+
+    return {"money": float(money or 0), "fixed": sorted(fixed), "variable": variable}
+
+def fingerprint(inputs: dict, *params) -> str:
+    return hashlib.sha256(repr((inputs, params)).encode()).hexdigest()
+
+def fixed_deltas(inputs: dict, horizon_days: int):
+    import numpy as np
+
+    # Día 1..horizon_days; el día 0 es hoy (saldo actual)
+    deltas = np.zeros(horizon_days + 1)
+    for amount, frequency, first in inputs["fixed"]:
+        deltas[first:horizon_days + 1:frequency] += amount
+    return deltas
+
+def too_many_cells(horizon_days: int, simulations: int) -> bool:
+    return simulations * horizon_days > FORECAST_MAX_CELLS
+
+def histogram_edges(inputs: dict, horizon_days: int, step: int):
+    import numpy as np
+
+    # Media y varianza exactas del saldo en cada punto: parte fija determinista más una
+    # Poisson compuesta por flujo variable (media t·λ·E[X], varianza t·λ·E[X²])
+    days = np.arange(0, horizon_days + 1, step)
+    mean = inputs["money"] + np.cumsum(fixed_deltas(inputs, horizon_days))[::step]
+    variance = np.zeros(len(days))
+    for sign, rate, amounts in inputs["variable"]:
+        if amounts:
+            values = np.array(amounts)
+            mean = mean + sign * rate * values.mean() * days
+            variance = variance + rate * (values ** 2).mean() * days
+    # Medio céntimo de margen: con varianza 0 todas las simulaciones caen en el bin central
+    half_width = HISTOGRAM_SIGMAS * np.sqrt(variance) + 0.005
+    return mean - half_width, 2 * half_width / FORECAST_HISTOGRAM_BINS
+
+def simulate_batch(inputs: dict, horizon_days: int, step: int, seed, count: int, low, width):
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    deltas = np.broadcast_to(fixed_deltas(inputs, horizon_days), (count, horizon_days + 1)).copy()
+    for sign, rate, amounts in inputs["variable"]:
+        if not amounts:
+            continue
+        # Poisson independiente por (simulación, día) = un total Poisson repartido
+        # uniformemente entre las celdas; evita generar una variable por celda. Los
+        # eventos se generan en tramos: la memoria no crece con la tasa del historial
+        values = np.array(amounts)
+        remaining = rng.poisson(rate * count * horizon_days)
+        while remaining:
+            size = min(remaining, FORECAST_BATCH_EVENTS)
+            cells = rng.integers(0, count * horizon_days, size=size)
+            # Un importe re-muestreado por evento, sumado en su (simulación, día)
+            draws = sign * rng.choice(values, size=size)
+            deltas[:, 1:] += np.bincount(cells, weights=draws, minlength=count * horizon_days).reshape(count, horizon_days)
+            remaining -= size
+
+    # Saldos sobre la propia matriz de deltas, sin otra copia del lote
+    balances = np.cumsum(deltas, axis=1, out=deltas)
+    balances += inputs["money"]
+    ever_negative = int((balances < 0).any(axis=1).sum())
+    sampled = balances[:, ::step]
+    del balances, deltas
+    # Un histograma por punto; los valores fuera de rango cuentan en el primer/último bin
+    bins = np.clip(((sampled - low) / width).astype(np.int64), 0, FORECAST_HISTOGRAM_BINS - 1)
+    bins += np.arange(sampled.shape[1]) * FORECAST_HISTOGRAM_BINS
+    histogram = np.bincount(bins.ravel(), minlength=sampled.shape[1] * FORECAST_HISTOGRAM_BINS)
+    histogram = histogram.reshape(sampled.shape[1], FORECAST_HISTOGRAM_BINS)
+    return histogram, (sampled < 0).sum(axis=0), ever_negative
+
+def histogram_percentiles(histogram, low, width, total: int) -> list:
+    import numpy as np
+
+    # Interpolación lineal dentro del bin que contiene el rango buscado
+    cumulative = np.cumsum(histogram, axis=1)
+    points = np.arange(histogram.shape[0])
+    bands = []
+    for percentile in PERCENTILES:
+        target = percentile / 100 * total
+        index = np.argmax(cumulative >= target, axis=1)
+        before = np.where(index > 0, cumulative[points, index - 1], 0)
+        fraction = (target - before) / np.maximum(histogram[points, index], 1)
+        bands.append(low + (index + fraction) * width)
+    return bands
+
+def run(inputs: dict, horizon_days: int, step: int, simulations: int, seed: int):
+    import numpy as np
+
+    sizes = [FORECAST_BATCH_SIMULATIONS] * (simulations // FORECAST_BATCH_SIMULATIONS)
+    if simulations % FORECAST_BATCH_SIMULATIONS:
+        sizes.append(simulations % FORECAST_BATCH_SIMULATIONS)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    low, width = histogram_edges(inputs, horizon_days, step)
+    args = [(inputs, horizon_days, step, batch_seed, size, low, width) for batch_seed, size in zip(seeds, sizes)]
+    # Con FORECAST_WORKERS=0 o un solo lote se simula en el propio hilo
+    if FORECAST_WORKERS > 0 and len(args) > 1:
+        results = _get_pool().map(simulate_batch, *zip(*args))
+    else:
+        results = (simulate_batch(*batch) for batch in args)
+    # Los resultados de los lotes se suman según llegan
+    histogram, negative, ever_negative = 0, 0, 0
+    for batch_histogram, batch_negative, batch_ever_negative in results:
+        histogram = histogram + batch_histogram
+        negative = negative + batch_negative
+        ever_negative += batch_ever_negative
+    return histogram, low, width, negative, ever_negative
+
+def forecast(inputs: dict, horizon_days: int, step: int, simulations: int, seed: int, today) -> dict:
+    import numpy as np
+
+    histogram, low, width, negative, ever_negative = run(inputs, horizon_days, step, simulations, seed)
+    bands = histogram_percentiles(histogram, low, width, simulations)
+    return {
+        "start_date": today.isoformat(),
+        "resolution_days": step,
+        "points": histogram.shape[0],
+        "simulations": simulations,
+        "seed": seed,
+        "starting_balance": round(inputs["money"], 2),
+        "percentiles": {f"p{percentile}": np.round(band, 2).tolist() for percentile, band in zip(PERCENTILES, bands)},
+        "probability_negative": ever_negative / simulations,
+        "probability_negative_by_point": np.round(negative / simulations, 4).tolist(),
+    }
+
+def forecast_user(db: Session, user_id: int, horizon_days: int, step: int, simulations: int, seed: int) -> dict:
+    today = datetime.utcnow().date()
+    inputs = load_inputs(db, user_id, today)
+    key = (user_id, fingerprint(inputs, horizon_days, step, simulations, seed, today))
+    result = forecast_cache.get(key)
+    if result is None:
+        result = dict(forecast(inputs, horizon_days, step, simulations, seed, today), user_id=user_id)
+        forecast_cache.set(key, result)
+    return result
@@ -0,0 +1,104 @@
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import select, literal
+from sqlalchemy.orm import Session
+from ..models import FixedInvestment as FixedInvestmentModel, VariableInvestment as VariableInvestmentModel
+from .cache import TTLCache
+
+# Curvas de valor futuro de las inversiones activas de un usuario. Todas las
+# posiciones sin curva en cache se calculan a la vez (matriz inversiones x puntos);
+# numpy se importa al usarse para no cargarlo en el arranque de los workers.
+
+INVESTMENT_PROJECTION_MAX_POINTS = int(os.getenv("INVESTMENT_PROJECTION_MAX_POINTS", "2000"))
+INVESTMENT_CACHE_TTL_SECONDS = float(os.getenv("INVESTMENT_CACHE_TTL_SECONDS", "3600"))
+INVESTMENT_CACHE_MAX_ENTRIES = int(os.getenv("INVESTMENT_CACHE_MAX_ENTRIES", "50000"))
+INVESTMENT_CACHE_MAX_BYTES = int(os.getenv("INVESTMENT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+RESOLUTIONS = {"day": 1, "week": 7, "month": 30, "quarter": 90, "year": 365}
+
+# Curva por posición y resolución; la clave incluye updated_at, así una posición modificada
+# no reutiliza la anterior. Sin el número de puntos: un horizonte más corto usa el principio
+# de la curva guardada y uno más largo la sustituye. Limitada también en bytes.
+curve_cache = TTLCache(
+    maxsize=INVESTMENT_CACHE_MAX_ENTRIES,
+    ttl=INVESTMENT_CACHE_TTL_SECONDS,
+    maxbytes=INVESTMENT_CACHE_MAX_BYTES,
+    sizeof=lambda curve: curve.nbytes,
+)
+
+def investment_statement(model, kind: str, pk, start, end):
+    return select(
+        literal(kind).label("kind"), pk.label("investment_id"), model.name, model.amount, model.interest_rate,
+        model.interest_type, model.interest_period_days, start.label("start_date"), end.label("end_date"), model.updated_at,
+    )
+
+def load_investments(db: Session, user_id: int) -> list:
+    fixed = investment_statement(
+        FixedInvestmentModel, "fixed", FixedInvestmentModel.fixed_investment_id,
+        FixedInvestmentModel.created_at, literal(None),
+    ).where(FixedInvestmentModel.user_id == user_id, FixedInvestmentModel.status == "active")
+    variable = investment_statement(
+        VariableInvestmentModel, "variable", VariableInvestmentModel.variable_investment_id,
+        VariableInvestmentModel.start_date, VariableInvestmentModel.end_date,
+    ).where(VariableInvestmentModel.user_id == user_id, VariableInvestmentModel.status == "active")
+    return db.execute(fixed).all() + db.execute(variable).all()
+
+def as_date(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.date() if isinstance(value, datetime) else value
+
+def curves(rows: list, today, points: int, step: int):
+    import numpy as np
+
+    # Días de cada punto desde el inicio de cada inversión; el interés se detiene en end_date
+    offsets = np.arange(points) * step
+    since_start = np.array([(today - as_date(row.start_date)).days for row in rows], dtype=float)
+    length = np.array([
+        (as_date(row.end_date) - as_date(row.start_date)).days if row.end_date is not None else np.inf
+        for row in rows
+    ])
+    elapsed = np.clip(since_start[:, None] + offsets[None, :], 0, length[:, None])
+
+    amount = np.array([float(row.amount) for row in rows])[:, None]
+    rate = np.array([float(row.interest_rate) for row in rows])[:, None] / 100
+    periods = elapsed / np.maximum(np.array([row.interest_period_days for row in rows], dtype=float), 1)[:, None]
+    simple = np.array([row.interest_type == "simple" for row in rows])[:, None]
+    return np.where(simple, amount * (1 + rate * periods), amount * (1 + rate) ** periods)
+
+def project(rows: list, horizon_days: int, step: int, today=None) -> dict:
+    import numpy as np
+
+    today = today or datetime.utcnow().date()
+    points = horizon_days // step + 1
+    keys = [(row.kind, row.investment_id, row.updated_at, today, step) for row in rows]
+    values = [curve_cache.get(key) for key in keys]
+    values = [value[:points] if value is not None and len(value) >= points else None for value in values]
+    missing = [index for index, value in enumerate(values) if value is None]
+    if missing:
+        for index, curve in zip(missing, curves([rows[index] for index in missing], today, points, step)):
+            curve_cache.set(keys[index], curve)
+            values[index] = curve
+
+    total = np.sum(values, axis=0) if values else np.zeros(points)
+    return {
+        "start_date": today.isoformat(),
+        "end_date": (today + timedelta(days=(points - 1) * step)).isoformat(),
+        "resolution_days": step,
+        "points": points,
+        "investments": [
+            {
+                "type": row.kind,
+                "investment_id": row.investment_id,
+                "name": row.name,
+                "values": np.round(value, 2).tolist(),
+            }
+            for row, value in zip(rows, values)
+        ],
+        "total": np.round(total, 2).tolist(),
+    }
+
+def project_user(db: Session, user_id: int, horizon_days: int, step: int) -> dict:
+    return dict(project(load_investments(db, user_id), horizon_days, step), user_id=user_id)
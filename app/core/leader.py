@@ -0,0 +1,115 @@
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from functools import wraps
+from sqlalchemy import update, or_, case
+from sqlalchemy.exc import IntegrityError
+from ..database import SessionLocal
+from ..models import SchedulerLease
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = os.getenv("SCHEDULER_LEASE_NAME", "scheduler")
+LEASE_TTL_SECONDS = int(os.getenv("SCHEDULER_LEASE_TTL_SECONDS", "60"))
+HEARTBEAT_SECONDS = int(os.getenv("SCHEDULER_HEARTBEAT_SECONDS", "15"))
+
+_instance = {"pid": None, "id": None}
+
+def instance_id() -> str:
+    # Se calcula por proceso: con gunicorn --preload el módulo se importa antes del fork
+    pid = os.getpid()
+    if _instance["pid"] != pid:
+        _instance["pid"] = pid
+        _instance["id"] = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+    return _instance["id"]
+
+def acquire_statement(name: str, me: str, now: datetime, expires_at: datetime):
+    # Renueva si ya somos el líder o toma el lease si el anterior expiró
+    return (
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(SchedulerLease.holder == me, SchedulerLease.expires_at < now),
+        )
+        # MySQL evalúa el SET de izquierda a derecha: acquired_at tiene que leer el holder
+        # anterior, antes de sobrescribirlo
+        .ordered_values(
+            (SchedulerLease.acquired_at, case((SchedulerLease.holder == me, SchedulerLease.acquired_at), else_=now)),
+            (SchedulerLease.holder, me),
+            (SchedulerLease.heartbeat_at, now),
+            (SchedulerLease.expires_at, expires_at),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def try_acquire(name: str = LEASE_NAME) -> bool:
+    me = instance_id()
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=LEASE_TTL_SECONDS)
+    db = SessionLocal()
+    try:
+        result = db.execute(acquire_statement(name, me, now, expires_at))
+        if result.rowcount:
+            db.commit()
+            return True
+        db.add(SchedulerLease(name=name, holder=me, acquired_at=now, heartbeat_at=now, expires_at=expires_at))
+        db.commit()
+        logger.info("Scheduler lease %s acquired by %s", name, me)
+        return True
+    except IntegrityError:
+        db.rollback()
+        return False
+    finally:
+        db.close()
+
+def release(name: str = LEASE_NAME):
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(SchedulerLease)
+            .where(SchedulerLease.name == name, SchedulerLease.holder == instance_id())
+            .values(expires_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    finally:
+        db.close()
+
+def lease_status(name: str = LEASE_NAME) -> dict:
+    db = SessionLocal()
+    try:
+        lease = db.query(SchedulerLease).filter(SchedulerLease.name == name).first()
+    finally:
+        db.close()
+    me = instance_id()
+    if lease is None:
+        return {"name": name, "holder": None, "acquired_at": None, "heartbeat_at": None,
+                "expires_at": None, "is_expired": True, "instance_id": me, "is_leader": False}
+    is_expired = lease.expires_at < datetime.utcnow()
+    return {
+        "name": lease.name,
+        "holder": lease.holder,
+        "acquired_at": lease.acquired_at,
+        "heartbeat_at": lease.heartbeat_at,
+        "expires_at": lease.expires_at,
+        "is_expired": is_expired,
+        "instance_id": me,
+        "is_leader": lease.holder == me and not is_expired,
+    }
+
+def heartbeat():
+    try:
+        try_acquire()
+    except Exception:
+        logger.exception("Scheduler lease heartbeat failed")
+
+def leader_only(func):
+    # El job sólo se ejecuta en el proceso que tiene el lease (se renueva justo antes)
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not try_acquire():
+            return None
+        return func(*args, **kwargs)
+    return wrapper
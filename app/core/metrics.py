@@ -0,0 +1,145 @@
+import os
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+
+# Métricas por ruta en formato Prometheus: latencia, sentencias SQL y tiempo en base de
+# datos por petición. Las series solo se escriben desde el hilo del event loop (el
+# middleware registra al enviar el último fragmento de la respuesta) y /metrics se lee
+# en ese mismo hilo, así que no hace falta ningún lock. Los eventos del engine, que
+# pueden dispararse en el threadpool, solo tocan el contexto de su propia petición.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+# Sin ruta (404, métodos no permitidos): una sola etiqueta para no disparar la cardinalidad
+UNMATCHED_ROUTE = "unmatched"
+
+class RequestContext:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+request_context = ContextVar("request_metrics", default=None)
+
+class Series:
+    __slots__ = ("latency_buckets", "latency_sum", "count", "db_buckets", "db_sum", "statements")
+
+    def __init__(self):
+        # Contadores por bucket (no acumulados); el acumulado se calcula al exportar
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.db_buckets = [0] * (len(DB_TIME_BUCKETS) + 1)
+        self.db_sum = 0.0
+        self.statements = 0
+
+series = {}
+
+def observe(method: str, route: str, status: int, seconds: float, context: RequestContext):
+    key = (method, route, status)
+    entry = series.get(key)
+    if entry is None:
+        entry = series[key] = Series()
+    entry.latency_buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+    entry.latency_sum += seconds
+    entry.count += 1
+    entry.db_buckets[bisect_left(DB_TIME_BUCKETS, context.db_seconds)] += 1
+    entry.db_sum += context.db_seconds
+    entry.statements += context.statements
+
+def route_template(scope) -> str:
+    # FastAPI deja la ruta resuelta en el scope: /user/goals/{id}, no la URL concreta
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+class MetricsMiddleware:
+    # Middleware ASGI puro: sin BaseHTTPMiddleware, que añade una tarea y colas por petición
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        context = RequestContext()
+        token = request_context.set(context)
+        started = time.perf_counter()
+        status = 500
+        recorded = False
+
+        async def send_wrapper(message):
+            nonlocal status, recorded
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            # Se registra con el último fragmento: las BackgroundTasks corren después
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not recorded:
+                recorded = True
+                observe(scope["method"], route_template(scope), status, time.perf_counter() - started, context)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not recorded:
+                observe(scope["method"], route_template(scope), status, time.perf_counter() - started, context)
+            request_context.reset(token)
+
+def instrument_engine(engine):
+    if not METRICS_ENABLED:
+        return
+
+    # Fuera de una petición (scheduler, escritor de movimientos) no hay contexto y no se mide
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(connection, cursor, statement, parameters, execution_context, executemany):
+        context = request_context.get()
+        if context is not None and execution_context is not None:
+            context.statements += 1
+            execution_context.metrics_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(connection, cursor, statement, parameters, execution_context, executemany):
+        context = request_context.get()
+        started = getattr(execution_context, "metrics_started", None)
+        if context is not None and started is not None:
+            context.db_seconds += time.perf_counter() - started
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def histogram_lines(name: str, labels: str, bounds: tuple, buckets: list, total: float, count: int) -> list:
+    lines = []
+    cumulative = 0
+    for bound, value in zip(bounds, buckets):
+        cumulative += value
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+    lines.append(f"{name}_sum{{{labels}}} {total}")
+    lines.append(f"{name}_count{{{labels}}} {count}")
+    return lines
+
+def render() -> str:
+    latency = [
+        "# HELP http_request_duration_seconds Request latency by route template and status.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    db_time = [
+        "# HELP http_request_db_seconds Time spent executing SQL per request.",
+        "# TYPE http_request_db_seconds histogram",
+    ]
+    statements = [
+        "# HELP http_request_db_statements_total SQL statements executed by requests.",
+        "# TYPE http_request_db_statements_total counter",
+    ]
+    for (method, route, status), entry in sorted(series.items()):
+        labels = f'method="{method}",route="{escape_label(route)}",status="{status}"'
+        latency.extend(histogram_lines("http_request_duration_seconds", labels, LATENCY_BUCKETS, entry.latency_buckets, entry.latency_sum, entry.count))
+        db_time.extend(histogram_lines("http_request_db_seconds", labels, DB_TIME_BUCKETS, entry.db_buckets, entry.db_sum, entry.count))
+        statements.append(f"http_request_db_statements_total{{{labels}}} {entry.statements}")
+    return "\n".join(latency + db_time + statements) + "\n"
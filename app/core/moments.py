@@ -0,0 +1,250 @@
+import argparse
+import logging
+import math
+import sys
+from datetime import date, datetime, time
+from sqlalchemy import select, update, insert, func, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models import TrendMoments as MomentsModel
+from .summary import SOURCES
+
+logger = logging.getLogger(__name__)
+
+# Momentos de regresión por (usuario, recurso) sobre el eje temporal:
+# x = días enteros desde TIME_ORIGIN de la fecha de negocio (received_date, paid_date,
+# start_date) o de created_at en los recursos que no la tienen; y = amount de las filas
+# activas. Las escrituras suman la aportación nueva y restan la anterior, así la
+# tendencia, la media y la varianza se calculan sin recorrer el historial. Con x entero
+# las sumas de x son exactas en coma flotante: filas del mismo día dan varianza cero
+# exacta en vez de restos de la cancelación de n·Σx² - (Σx)².
+
+TIME_ORIGIN = datetime(2000, 1, 1)
+SUMS = ("n", "sx", "sy", "sxy", "sxx", "syy")
+
+# user_money es un único registro por usuario: no tiene tendencia
+TRACKED = {name: model for name, model in SOURCES.items() if name != "user_money"}
+
+# Fecha de negocio de cada recurso; created_at colapsa en un instante con /bulk
+AXIS_FIELDS = {"variable_incomes": "received_date", "variable_expenses": "paid_date", "variable_investments": "start_date"}
+
+def axis_field(table_name: str) -> str:
+    return AXIS_FIELDS.get(table_name, "created_at")
+
+def axis_column(table_name: str):
+    return getattr(TRACKED[table_name], axis_field(table_name))
+
+def days_since_origin(column, dialect: str):
+    if dialect == "sqlite":
+        return func.julianday(func.date(column)) - func.julianday(TIME_ORIGIN.date().isoformat())
+    if dialect in ("mysql", "mariadb"):
+        return func.datediff(column, TIME_ORIGIN.date())
+    return func.extract("day", func.date_trunc("day", column) - TIME_ORIGIN)
+
+def as_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.combine(value, time())
+
+def to_days(value) -> int:
+    day = value.date() if isinstance(value, datetime) else value
+    return (day - TIME_ORIGIN.date()).days
+
+def contribution(table_name: str, row) -> dict:
+    if table_name not in TRACKED or row is None or row["status"] != "active":
+        return {}
+    x, y = to_days(row[axis_field(table_name)]), float(row["amount"])
+    return {"n": 1, "sx": x, "sy": y, "sxy": x * y, "sxx": x * x, "syy": y * y}
+
+def add_changes(total: dict, changes: dict, sign: int = 1):
+    for field in SUMS:
+        if field in changes:
+            total[field] = total.get(field, 0) + sign * changes[field]
+    # Rango del eje de las filas que entran; una salida obliga a recalcularlo
+    if "added_first" in changes:
+        total["added_first"] = min(total.get("added_first", changes["added_first"]), changes["added_first"])
+        total["added_last"] = max(total.get("added_last", changes["added_last"]), changes["added_last"])
+    total["removed"] = total.get("removed", False) or changes.get("removed", False)
+
+def difference(table_name: str, old, new) -> dict:
+    before, after = contribution(table_name, old), contribution(table_name, new)
+    changes = {}
+    if after:
+        add_changes(changes, after)
+        if not before:
+            changes["added_first"] = changes["added_last"] = as_datetime(new[axis_field(table_name)])
+    if before:
+        add_changes(changes, before, -1)
+        changes["removed"] = not after
+    return changes
+
+def apply_changes(db: Session, user_id: int, table_name: str, changes: dict):
+    if not any(changes.get(field) for field in SUMS) and not changes.get("removed"):
+        return
+    db.flush()
+    table = MomentsModel.__table__
+    values = {field: table.c[field] + changes[field] for field in SUMS if changes.get(field)}
+    if changes.get("n"):
+        # Sin filas las sumas vuelven a cero exacto, sin residuos de coma flotante
+        emptied = table.c.n + changes["n"] == 0
+        values.update({field: case((emptied, 0.0), else_=value) for field, value in values.items() if field != "n"})
+    if "added_first" in changes:
+        values["first_at"] = case((table.c.first_at.is_(None) | (table.c.first_at > changes["added_first"]), changes["added_first"]), else_=table.c.first_at)
+        values["last_at"] = case((table.c.last_at.is_(None) | (table.c.last_at < changes["added_last"]), changes["added_last"]), else_=table.c.last_at)
+    # n va al final: MySQL evalúa el SET de izquierda a derecha con los valores ya asignados
+    values["updated_at"] = datetime.utcnow()
+    assignments = [(table.c[field], value) for field, value in values.items() if field != "n"]
+    if "n" in values:
+        assignments.append((table.c.n, values["n"]))
+    result = db.execute(
+        update(table)
+        .where(table.c.user_id == user_id, table.c.resource == table_name)
+        .ordered_values(*assignments)
+    )
+    if result.rowcount == 0:
+        # Primera escritura de este recurso: se calcula desde cero (ya incluye este cambio)
+        refresh(db, user_id, table_name)
+    elif changes.get("removed"):
+        # min/max no se pueden restar; con el índice (user_id, status, eje) es una búsqueda
+        model, axis = TRACKED[table_name], axis_column(table_name)
+        first_at, last_at = db.execute(
+            select(func.min(axis), func.max(axis))
+            .where(model.user_id == user_id, model.status == "active")
+        ).one()
+        db.execute(
+            update(table)
+            .where(table.c.user_id == user_id, table.c.resource == table_name)
+            .values(first_at=as_datetime(first_at), last_at=as_datetime(last_at))
+        )
+
+def compute(db: Session, table_name: str, user_id: int | None = None) -> dict:
+    # Recalculo completo con una consulta agregada por recurso (agrupada por usuario)
+    model, axis = TRACKED[table_name], axis_column(table_name)
+    points = select(
+        model.user_id,
+        days_since_origin(axis, db.get_bind().dialect.name).label("x"),
+        model.amount.label("y"),
+        axis.label("at"),
+    ).where(model.status == "active")
+    if user_id is not None:
+        points = points.where(model.user_id == user_id)
+    points = points.subquery()
+    x, y = points.c.x, points.c.y
+    rows = db.execute(
+        select(
+            points.c.user_id, func.count(), func.sum(x), func.sum(y), func.sum(x * y), func.sum(x * x), func.sum(y * y),
+            func.min(points.c.at), func.max(points.c.at),
+        ).group_by(points.c.user_id)
+    )
+    moments = {}
+    for uid, n, *sums, first_at, last_at in rows:
+        moments[uid] = dict(zip(SUMS, [n] + [float(value) for value in sums]), first_at=as_datetime(first_at), last_at=as_datetime(last_at))
+    return moments
+
+def empty() -> dict:
+    return dict(dict.fromkeys(SUMS, 0), first_at=None, last_at=None)
+
+def store(db: Session, user_id: int, table_name: str, moments: dict):
+    table = MomentsModel.__table__
+    values = dict(moments, updated_at=datetime.utcnow())
+    where = (table.c.user_id == user_id, table.c.resource == table_name)
+    if db.execute(update(table).where(*where).values(**values)).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(table).values(user_id=user_id, resource=table_name, **values))
+    except IntegrityError:
+        db.execute(update(table).where(*where).values(**values))
+
+def refresh(db: Session, user_id: int, table_name: str):
+    store(db, user_id, table_name, compute(db, table_name, user_id).get(user_id, empty()))
+
+def refresh_user(db: Session, user_id: int):
+    for table_name in TRACKED:
+        refresh(db, user_id, table_name)
+
+def read(db: Session, user_id: int, table_name: str):
+    row = db.get(MomentsModel, (user_id, table_name))
+    if row is None:
+        refresh(db, user_id, table_name)
+        db.commit()
+        row = db.get(MomentsModel, (user_id, table_name))
+    return row
+
+def trend(row):
+    # Mínimos cuadrados con x en días desde el primer registro. Σx y Σx² son enteros: el
+    # denominador se calcula en enteros y es cero exacto si todas las filas caen el mismo día
+    if row.n == 0 or row.first_at == row.last_at:
+        return None
+    denominator = row.n * round(row.sxx) - round(row.sx) ** 2
+    if denominator <= 0:
+        return None
+    m = (row.n * row.sxy - row.sx * row.sy) / denominator
+    b = (row.sy - m * row.sx) / row.n
+    return m, b + m * to_days(row.first_at)
+
+def statistics(row) -> dict:
+    mean = row.sy / row.n if row.n else None
+    variance = max(row.syy - row.sy * row.sy / row.n, 0.0) / (row.n - 1) if row.n > 1 else None
+    return {"count": row.n, "mean": mean, "variance": variance, "first_at": row.first_at, "last_at": row.last_at}
+
+def close(stored: float, expected: float) -> bool:
+    return math.isclose(stored, expected, rel_tol=1e-8, abs_tol=1e-6)
+
+def find_drift(db: Session, user_id: int | None = None) -> tuple[dict, list]:
+    table = MomentsModel.__table__
+    stmt = select(table)
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == user_id)
+    stored = {(row["user_id"], row["resource"]): row for row in db.execute(stmt).mappings()}
+    expected = {
+        (uid, table_name): moments
+        for table_name in TRACKED
+        for uid, moments in compute(db, table_name, user_id).items()
+    }
+    drift = []
+    for key, row in stored.items():
+        moments = expected.get(key, empty())
+        for field in SUMS:
+            if not close(row[field], moments[field]):
+                drift.append({"user_id": key[0], "resource": key[1], "field": field, "stored": row[field], "expected": moments[field]})
+        for field in ("first_at", "last_at"):
+            if row[field] != moments[field]:
+                drift.append({"user_id": key[0], "resource": key[1], "field": field, "stored": row[field], "expected": moments[field]})
+    return expected, drift
+
+def rebuild(db: Session, user_id: int | None = None) -> list:
+    expected, drift = find_drift(db, user_id)
+    table = MomentsModel.__table__
+    stmt = select(table.c.user_id, table.c.resource)
+    if user_id is not None:
+        stmt = stmt.where(table.c.user_id == user_id)
+    for key in set(expected) | {tuple(row) for row in db.execute(stmt)}:
+        store(db, key[0], key[1], expected.get(key, empty()))
+    db.commit()
+    logger.info("Rebuilt trend moments, %s drifted fields", len(drift))
+    return drift
+
+def main():
+    # python -m app.core.moments check|rebuild [--user-id N]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--user-id", type=int)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            drift = rebuild(db, args.user_id)
+        else:
+            _, drift = find_drift(db, args.user_id)
+    finally:
+        db.close()
+    for item in drift:
+        print(f"user {item['user_id']} {item['resource']} {item['field']}: stored {item['stored']} expected {item['expected']}")
+    print(f"{len(drift)} drifted fields")
+    return 1 if drift and args.command == "check" else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+from ..database import engine
+from ..models import UserMovements as UserMovementsModel
+
+logger = logging.getLogger(__name__)
+
+# Registro de movimientos del usuario (auditoría de cada mutación).
+#   strict: la fila se inserta en la misma transacción que la entidad.
+#   write_behind: tras el commit de la entidad el movimiento va a una cola en memoria
+#     y un hilo lo inserta en lotes (INSERT multi-fila) cada N ms o N filas. Un
+#     rollback descarta los movimientos pendientes de esa sesión. Si el proceso muere
+#     se pierden como mucho los movimientos de la cola.
+
+USER_MOVEMENTS_MODE = os.getenv("USER_MOVEMENTS_MODE", "strict")
+USER_MOVEMENTS_FLUSH_MS = int(os.getenv("USER_MOVEMENTS_FLUSH_MS", "200"))
+USER_MOVEMENTS_FLUSH_ROWS = int(os.getenv("USER_MOVEMENTS_FLUSH_ROWS", "500"))
+USER_MOVEMENTS_QUEUE_MAX = int(os.getenv("USER_MOVEMENTS_QUEUE_MAX", "100000"))
+USER_MOVEMENTS_FLUSH_RETRIES = int(os.getenv("USER_MOVEMENTS_FLUSH_RETRIES", "3"))
+
+PENDING_KEY = "pending_user_movements"
+
+class MovementWriter:
+    # Hilo de escritura con su propia conexión; se arranca con el primer movimiento
+    def __init__(self, flush_ms: int, flush_rows: int, queue_max: int):
+        self.flush_seconds = flush_ms / 1000
+        self.flush_rows = max(flush_rows, 1)
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self._queue = queue.Queue(maxsize=queue_max)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def put(self, rows: list):
+        self._start()
+        for row in rows:
+            # Cola llena: se bloquea la petición en lugar de perder el movimiento
+            self._queue.put(row)
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="user-movements-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+
+    def _collect(self) -> list:
+        batch = []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.flush_rows:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or (self._stop.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: list):
+        for attempt in range(1, USER_MOVEMENTS_FLUSH_RETRIES + 1):
+            try:
+                with engine.begin() as connection:
+                    connection.execute(insert(UserMovementsModel).values(batch))
+                self.written += len(batch)
+                self.batches += 1
+                return
+            except Exception:
+                logger.exception("User movements flush failed (attempt %s, %s rows)", attempt, len(batch))
+                time.sleep(min(attempt * self.flush_seconds, 5))
+        self.dropped += len(batch)
+        logger.error("Dropped %s user movements after %s attempts", len(batch), USER_MOVEMENTS_FLUSH_RETRIES)
+
+    def stop(self, timeout: float = 10.0):
+        # Vacía la cola antes de terminar (shutdown de la aplicación)
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def status(self) -> dict:
+        return {
+            "mode": USER_MOVEMENTS_MODE,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "flush_ms": int(self.flush_seconds * 1000),
+            "flush_rows": self.flush_rows,
+        }
+
+writer = MovementWriter(USER_MOVEMENTS_FLUSH_MS, USER_MOVEMENTS_FLUSH_ROWS, USER_MOVEMENTS_QUEUE_MAX)
+
+def record(db, user_id: int, description: str):
+    # db puede ser Session o AsyncSession (info es el de la sesión síncrona subyacente)
+    values = {"user_id": user_id, "description": description, "created_at": datetime.utcnow()}
+    if USER_MOVEMENTS_MODE == "write_behind":
+        db.info.setdefault(PENDING_KEY, []).append(values)
+    else:
+        db.add(UserMovementsModel(**values))
+
+@event.listens_for(Session, "after_commit")
+def enqueue_pending(session: Session):
+    # Solo el commit de la transacción raíz; los SAVEPOINT (begin_nested) también lo disparan
+    if session.in_nested_transaction():
+        return
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        writer.put(pending)
+
+@event.listens_for(Session, "after_transaction_end")
+def discard_pending(session: Session, transaction):
+    # La transacción raíz terminó sin commit: los movimientos pendientes se descartan
+    if transaction.parent is None:
+        session.info.pop(PENDING_KEY, None)
+
+def stop_writer():
+    writer.stop()
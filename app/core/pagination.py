@@ -0,0 +1,43 @@
+import base64
+import json
+import os
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+LIST_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "100"))
+LIST_MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "1000"))
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), item_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, item_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(item_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="err_invalid_cursor")
+
+def paginate(stmt, created_column, id_column, cursor: str | None, limit: int | None, descending: bool = False):
+    # Keyset sobre (created_at, id); se pide una fila extra para saber si hay otra página.
+    # limit=None: mismo orden, sin límite (listados completos)
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        if descending:
+            stmt = stmt.where(or_(created_column < created_at, and_(created_column == created_at, id_column < item_id)))
+        else:
+            stmt = stmt.where(or_(created_column > created_at, and_(created_column == created_at, id_column > item_id)))
+    if descending:
+        stmt = stmt.order_by(created_column.desc(), id_column.desc())
+    else:
+        stmt = stmt.order_by(created_column, id_column)
+    return stmt if limit is None else stmt.limit(limit + 1)
+
+def split_page(rows: list, limit: int | None, key) -> tuple[list, str | None]:
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
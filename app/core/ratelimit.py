@@ -0,0 +1,72 @@
+import math
+import os
+import threading
+import time
+from collections import Counter
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+from slowapi import Limiter
+from slowapi.errors import RateLimitExceeded
+from slowapi.util import get_remote_address
+
+# Límites de peticiones con slowapi. Las rutas de /auth llevan su propio límite por IP;
+# el resto comparte un límite global por usuario (user_id del token, o IP sin token)
+# que aplica SlowAPIASGIMiddleware. Con varias instancias, RATE_LIMIT_STORAGE_URI
+# debe apuntar a un almacenamiento común (p. ej. redis://).
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI", "memory://")
+AUTH_RATE_LIMIT = os.getenv("AUTH_RATE_LIMIT", "10/minute")
+USER_RATE_LIMIT = os.getenv("USER_RATE_LIMIT", "600/minute")
+
+_rejected = Counter()
+_rejected_lock = threading.Lock()
+
+def principal_key(request: Request) -> str:
+    # Token verificado (HMAC, sin base de datos): un user_id falso no sirve para repartir la carga
+    from ..routers.auth import SECRET_KEY, ALGORITHM
+
+    authorization = request.headers.get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("user_id")
+        except JWTError:
+            user_id = None
+        if user_id is not None:
+            return f"user:{user_id}"
+    return f"ip:{get_remote_address(request)}"
+
+def ip_key(request: Request) -> str:
+    return f"ip:{get_remote_address(request)}"
+
+limiter = Limiter(
+    key_func=principal_key,
+    application_limits=[USER_RATE_LIMIT],
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    enabled=RATE_LIMIT_ENABLED,
+)
+
+def rate_limit_exceeded(request: Request, exc: RateLimitExceeded) -> JSONResponse:
+    limit, args = request.state.view_rate_limit
+    reset_at, _ = limiter.limiter.get_window_stats(limit, *args)
+    retry_after = max(math.ceil(reset_at - time.time()), 1)
+    with _rejected_lock:
+        _rejected[str(exc.limit.limit)] += 1
+    return JSONResponse(
+        {"detail": "err_rate_limited"},
+        status_code=429,
+        headers={"Retry-After": str(retry_after)},
+    )
+
+def rate_limit_status() -> dict:
+    with _rejected_lock:
+        rejected = dict(_rejected)
+    return {
+        "enabled": limiter.enabled,
+        "storage": RATE_LIMIT_STORAGE_URI.split("://")[0],
+        "auth_limit": AUTH_RATE_LIMIT,
+        "user_limit": USER_RATE_LIMIT,
+        "rejected": rejected,
+    }
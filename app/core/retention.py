@@ -0,0 +1,54 @@
+import logging
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import select, insert, delete
+from sqlalchemy.orm import Session
+from ..models import UserMovements as UserMovementsModel, UserMovementsArchive as ArchiveModel
+
+logger = logging.getLogger(__name__)
+
+# Los movimientos con más de USER_MOVEMENTS_RETENTION_DAYS pasan a user_movements_archive
+# por bloques de ids: INSERT ... SELECT + DELETE en la misma transacción, así una fila
+# nunca está en las dos tablas ni en ninguna. 0 desactiva el archivado.
+
+USER_MOVEMENTS_RETENTION_DAYS = int(os.getenv("USER_MOVEMENTS_RETENTION_DAYS", "180"))
+USER_MOVEMENTS_ARCHIVE_CHUNK = int(os.getenv("USER_MOVEMENTS_ARCHIVE_CHUNK", "5000"))
+
+ARCHIVE_COLUMNS = ("movement_id", "user_id", "description", "created_at")
+
+def archive_chunk(db: Session, cutoff: datetime, after_id: int) -> list:
+    hot = UserMovementsModel.__table__
+    ids = db.execute(
+        select(hot.c.movement_id)
+        .where(hot.c.created_at < cutoff, hot.c.movement_id > after_id)
+        .order_by(hot.c.movement_id)
+        .limit(USER_MOVEMENTS_ARCHIVE_CHUNK)
+    ).scalars().all()
+    if not ids:
+        return ids
+    db.execute(
+        insert(ArchiveModel.__table__).from_select(
+            ARCHIVE_COLUMNS,
+            select(*(hot.c[name] for name in ARCHIVE_COLUMNS)).where(hot.c.movement_id.in_(ids)),
+        )
+    )
+    db.execute(delete(hot).where(hot.c.movement_id.in_(ids)))
+    db.commit()
+    return ids
+
+def archive_movements(db: Session, now: datetime | None = None) -> dict:
+    report = {"archived": 0, "chunks": 0, "cutoff": None}
+    if USER_MOVEMENTS_RETENTION_DAYS <= 0:
+        return report
+    cutoff = (now or datetime.utcnow()) - timedelta(days=USER_MOVEMENTS_RETENTION_DAYS)
+    report["cutoff"] = cutoff
+    last_id = 0
+    while True:
+        ids = archive_chunk(db, cutoff, last_id)
+        if not ids:
+            break
+        last_id = ids[-1]
+        report["archived"] += len(ids)
+        report["chunks"] += 1
+    logger.info("Archived %s user movements older than %s", report["archived"], cutoff)
+    return report
@@ -2,35 +2,28 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime
 from sqlalchemy.orm import Session
 from ..database import SessionLocal
-from ..models import FixedIncome as FixedIncomeModel, FixedExpense as FixedExpenseModel, UserMoney as UserMoneyModel
+from .accrual import run_accrual
+from .retention import archive_movements
+from .leader import heartbeat, leader_only, HEARTBEAT_SECONDS
 
+@leader_only
 def update_fixed_incomes_and_expenses():
     db: Session = SessionLocal()
     try:
-        now = datetime.utcnow()
-        fixed_incomes = db.query(FixedIncomeModel).filter(FixedIncomeModel.status == "active").all()
-        fixed_expenses = db.query(FixedExpenseModel).filter(FixedExpenseModel.status == "active").all()
-
-        for income in fixed_incomes:
-            if (now - income.updated_at).days >= income.frequency:
-                user_money = db.query(UserMoneyModel).filter(UserMoneyModel.user_id == income.user_id).first()
-                if user_money:
-                    user_money.amount += income.amount
-                    user_money.updated_at = now
-                    income.updated_at = now
-                    db.commit()
+        return run_accrual(db)
+    finally:
+        db.close()
 
-        for expense in fixed_expenses:
-            if (now - expense.updated_at).days >= expense.frequency:
-                user_money = db.query(UserMoneyModel).filter(UserMoneyModel.user_id == expense.user_id).first()
-                if user_money:
-                    user_money.amount -= expense.amount
-                    user_money.updated_at = now
-                    expense.updated_at = now
-                    db.commit()
+@leader_only
+def archive_old_movements():
+    db: Session = SessionLocal()
+    try:
+        return archive_movements(db)
     finally:
         db.close()
 
+# El scheduler se arranca en app.main (on_startup); sólo el líder ejecuta los jobs
 scheduler = BackgroundScheduler()
-scheduler.add_job(update_fixed_incomes_and_expenses, 'interval', days=1)
-scheduler.start()
\ No newline at end of file
+scheduler.add_job(heartbeat, 'interval', seconds=HEARTBEAT_SECONDS, next_run_time=datetime.now(), misfire_grace_time=None, id="scheduler_lease_heartbeat")
+scheduler.add_job(update_fixed_incomes_and_expenses, 'interval', days=1, id="update_fixed_incomes_and_expenses")
+scheduler.add_job(archive_old_movements, 'interval', days=1, id="archive_old_movements")
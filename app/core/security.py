@@ -1,10 +1,94 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 
-# Configura el contexto de hasheo para usar bcrypt con sal
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(PASSWORD_HASH_WORKERS, 1) * 4)))
+PASSWORD_HASH_RETRY_AFTER_SECONDS = os.getenv("PASSWORD_HASH_RETRY_AFTER_SECONDS", "1")
 
-def hash_password(password: str) -> str:
+# Configura el contexto de hasheo para usar bcrypt con sal.
+# min/max iguales al coste actual: cualquier hash con otro coste se marca para rehash.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+_pool = None
+_pool_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(max(PASSWORD_HASH_MAX_PENDING, 1))
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def _verify_and_update(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+def _acquire_pending():
+    if not _pending.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="err_server_busy",
+            headers={"Retry-After": PASSWORD_HASH_RETRY_AFTER_SECONDS},
+        )
+
+def _run(func, *args):
+    # Con PASSWORD_HASH_WORKERS=0 se hashea en el propio hilo (desarrollo/pruebas)
+    if PASSWORD_HASH_WORKERS <= 0:
+        return func(*args)
+    _acquire_pending()
+    try:
+        return _get_pool().submit(func, *args).result()
+    finally:
+        _pending.release()
+
+async def _run_async(func, *args):
+    # Para handlers async: se espera el futuro del pool sin ocupar un hilo del threadpool
+    if PASSWORD_HASH_WORKERS <= 0:
+        return await run_in_threadpool(func, *args)
+    _acquire_pending()
+    try:
+        return await asyncio.wrap_future(_get_pool().submit(func, *args))
+    finally:
+        _pending.release()
+
+def hash_password(password: str) -> str:
+    return _run(_hash, password)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return _run(_verify_and_update, plain_password, hashed_password)[0]
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    # Devuelve el nuevo hash cuando el almacenado no cumple la política de coste actual
+    return _run(_verify_and_update, plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    return await _run_async(_hash, password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    return await _run_async(_verify_and_update, plain_password, hashed_password)
+
+def shutdown_hash_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,210 @@
+import argparse
+import logging
+import sys
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models import (
+    UserFinancialSummary as SummaryModel,
+    FixedIncome as FixedIncomeModel,
+    VariableIncome as VariableIncomeModel,
+    FixedExpense as FixedExpenseModel,
+    VariableExpense as VariableExpenseModel,
+    Saving as SavingModel,
+    Debt as DebtModel,
+    Goal as GoalModel,
+    FixedInvestment as FixedInvestmentModel,
+    VariableInvestment as VariableInvestmentModel,
+    UserMoney as UserMoneyModel,
+)
+
+logger = logging.getLogger(__name__)
+
+# Resumen financiero por usuario (user_financial_summary). Cada fila activa de un
+# recurso aporta una cantidad a uno o varios campos; las escrituras aplican la
+# diferencia entre la aportación anterior y la nueva en la misma transacción.
+
+CENT = Decimal("0.01")
+DAYS_PER_MONTH = 30
+
+SUMMARY_FIELDS = (
+    "balance", "fixed_income_monthly", "fixed_expense_monthly", "variable_income_total",
+    "variable_expense_total", "savings_total", "debt_total", "invested_total",
+    "goal_target_total", "goal_saved_total",
+)
+
+# Columnas de origen de los agregados incrementales (este resumen y app/core/moments.py)
+SOURCE_FIELDS = ("amount", "frequency", "saved_amount", "status", "created_at", "received_date", "paid_date", "start_date")
+
+def money(value) -> Decimal:
+    return Decimal(str(value)).quantize(CENT, ROUND_HALF_UP)
+
+def monthly(amount, frequency: int) -> Decimal:
+    # frequency está en días, igual que en el job de acumulación
+    if frequency <= 0:
+        return money(amount)
+    return money(money(amount) * DAYS_PER_MONTH / frequency)
+
+CONTRIBUTIONS = {
+    "fixed_incomes": lambda row: {"fixed_income_monthly": monthly(row["amount"], row["frequency"])},
+    "fixed_expenses": lambda row: {"fixed_expense_monthly": monthly(row["amount"], row["frequency"])},
+    "variable_incomes": lambda row: {"variable_income_total": money(row["amount"])},
+    "variable_expenses": lambda row: {"variable_expense_total": money(row["amount"])},
+    "savings": lambda row: {"savings_total": money(row["amount"])},
+    "debts": lambda row: {"debt_total": money(row["amount"])},
+    "goals": lambda row: {"goal_target_total": money(row["amount"]), "goal_saved_total": money(row["saved_amount"])},
+    "fixed_investments": lambda row: {"invested_total": money(row["amount"])},
+    "variable_investments": lambda row: {"invested_total": money(row["amount"])},
+    "user_money": lambda row: {"balance": money(row["amount"])},
+}
+
+SOURCES = {
+    model.__tablename__: model
+    for model in (
+        FixedIncomeModel, VariableIncomeModel, FixedExpenseModel, VariableExpenseModel, SavingModel,
+        DebtModel, GoalModel, FixedInvestmentModel, VariableInvestmentModel, UserMoneyModel,
+    )
+}
+
+def source_columns(model) -> list:
+    return [getattr(model, name) for name in SOURCE_FIELDS if hasattr(model, name)]
+
+def entity_values(entity) -> dict:
+    return {name: getattr(entity, name) for name in SOURCE_FIELDS if hasattr(entity, name)}
+
+def contribution(table_name: str, row) -> dict:
+    if row is None or row["status"] != "active":
+        return {}
+    return CONTRIBUTIONS[table_name](row)
+
+def add_changes(total: dict, changes: dict, sign: int = 1):
+    for field, value in changes.items():
+        total[field] = total.get(field, Decimal("0")) + sign * value
+
+def difference(table_name: str, old, new) -> dict:
+    changes = {}
+    add_changes(changes, contribution(table_name, new))
+    add_changes(changes, contribution(table_name, old), -1)
+    return {field: value for field, value in changes.items() if value}
+
+def apply_changes(db: Session, user_id: int, changes: dict):
+    # Se llama después de escribir la entidad y antes del commit
+    changes = {field: value for field, value in changes.items() if value}
+    if not changes:
+        return
+    db.flush()
+    table = SummaryModel.__table__
+    result = db.execute(
+        update(table)
+        .where(table.c.user_id == user_id)
+        .values(**{field: table.c[field] + value for field, value in changes.items()}, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        # Primera escritura del usuario: se calcula desde cero (ya incluye este cambio)
+        refresh_user(db, user_id)
+
+def compute_user(db: Session, user_id: int) -> dict:
+    totals = dict.fromkeys(SUMMARY_FIELDS, Decimal("0"))
+    for table_name, model in SOURCES.items():
+        rows = db.execute(
+            select(*source_columns(model)).where(model.user_id == user_id, model.status == "active")
+        ).mappings()
+        for row in rows:
+            add_changes(totals, contribution(table_name, row))
+    return totals
+
+def compute_all(db: Session, batch_size: int = 5000) -> dict:
+    totals = {}
+    for table_name, model in SOURCES.items():
+        stmt = (
+            select(model.user_id, *source_columns(model))
+            .where(model.status == "active")
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for row in db.execute(stmt).mappings():
+            user_totals = totals.setdefault(row["user_id"], dict.fromkeys(SUMMARY_FIELDS, Decimal("0")))
+            add_changes(user_totals, contribution(table_name, row))
+    return totals
+
+def store(db: Session, user_id: int, totals: dict):
+    table = SummaryModel.__table__
+    values = dict(totals, updated_at=datetime.utcnow())
+    if db.execute(update(table).where(table.c.user_id == user_id).values(**values)).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(table).values(user_id=user_id, **values))
+    except IntegrityError:
+        # Otra transacción creó la fila a la vez
+        db.execute(update(table).where(table.c.user_id == user_id).values(**values))
+
+def refresh_user(db: Session, user_id: int):
+    store(db, user_id, compute_user(db, user_id))
+
+def summary_response(row) -> dict:
+    values = {field: getattr(row, field) for field in SUMMARY_FIELDS}
+    target = values["goal_target_total"]
+    values["goal_progress"] = float(values["goal_saved_total"] / target) if target else None
+    return dict(values, user_id=row.user_id, updated_at=row.updated_at)
+
+def read_summary(db: Session, user_id: int) -> dict:
+    row = db.get(SummaryModel, user_id)
+    if row is None:
+        refresh_user(db, user_id)
+        db.commit()
+        row = db.get(SummaryModel, user_id)
+    return summary_response(row)
+
+def stored_summaries(db: Session, user_id: int | None = None) -> dict:
+    stmt = select(SummaryModel.user_id, *(getattr(SummaryModel, field) for field in SUMMARY_FIELDS))
+    if user_id is not None:
+        stmt = stmt.where(SummaryModel.user_id == user_id)
+    return {row["user_id"]: row for row in db.execute(stmt).mappings()}
+
+def find_drift(db: Session, user_id: int | None = None) -> tuple[dict, list]:
+    # Las filas ausentes no son desviación: se crean en la siguiente escritura o lectura
+    expected = {user_id: compute_user(db, user_id)} if user_id is not None else compute_all(db)
+    stored = stored_summaries(db, user_id)
+    drift = []
+    for uid, row in stored.items():
+        totals = expected.get(uid, dict.fromkeys(SUMMARY_FIELDS, Decimal("0")))
+        for field in SUMMARY_FIELDS:
+            if money(row[field]) != money(totals[field]):
+                drift.append({"user_id": uid, "field": field, "stored": row[field], "expected": totals[field]})
+    return expected, drift
+
+def rebuild(db: Session, user_id: int | None = None, chunk_size: int = 500) -> list:
+    expected, drift = find_drift(db, user_id)
+    user_ids = sorted(set(expected) | set(stored_summaries(db, user_id)))
+    for start in range(0, len(user_ids), chunk_size):
+        for uid in user_ids[start:start + chunk_size]:
+            store(db, uid, expected.get(uid, dict.fromkeys(SUMMARY_FIELDS, Decimal("0"))))
+        db.commit()
+    logger.info("Rebuilt %s financial summaries, %s drifted fields", len(user_ids), len(drift))
+    return drift
+
+def main():
+    # python -m app.core.summary check|rebuild [--user-id N]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=["check", "rebuild"])
+    parser.add_argument("--user-id", type=int)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            drift = rebuild(db, args.user_id)
+        else:
+            _, drift = find_drift(db, args.user_id)
+    finally:
+        db.close()
+    for item in drift:
+        print(f"user {item['user_id']} {item['field']}: stored {item['stored']} expected {item['expected']}")
+    print(f"{len(drift)} drifted fields")
+    return 1 if drift and args.command == "check" else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
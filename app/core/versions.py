@@ -0,0 +1,37 @@
+from datetime import datetime
+from itertools import product
+from sqlalchemy import select, update, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..models import ResourceVersion as VersionModel
+
+# Versión por (usuario, recurso) de los listados de /user: es el validador del GET
+# condicional (app/routers/conditional.py). Toda escritura de filas de un recurso la
+# incrementa en su misma transacción: /user (track_changes y bulk), el devengo y la
+# cascada de admin. Un contador no depende de la resolución de updated_at ni de que
+# la escritura lo mueva hacia delante.
+
+def bump(db: Session, user_ids, *table_names: str):
+    user_ids, table_names = set(user_ids), set(table_names)
+    if not user_ids or not table_names:
+        return
+    table = VersionModel.__table__
+    now = datetime.utcnow()
+    scope = (table.c.user_id.in_(user_ids), table.c.resource.in_(table_names))
+    result = db.execute(update(table).where(*scope).values(version=table.c.version + 1, updated_at=now))
+    if result.rowcount == len(user_ids) * len(table_names):
+        return
+    existing = set(db.execute(select(table.c.user_id, table.c.resource).where(*scope)).tuples())
+    for user_id, table_name in set(product(user_ids, table_names)) - existing:
+        key = (table.c.user_id == user_id, table.c.resource == table_name)
+        try:
+            with db.begin_nested():
+                db.execute(insert(table).values(user_id=user_id, resource=table_name, version=1, updated_at=now))
+        except IntegrityError:
+            # Otra transacción creó la fila a la vez
+            db.execute(update(table).where(*key).values(version=table.c.version + 1, updated_at=now))
+
+def version_statement(user_id: int, table_name: str):
+    return select(VersionModel.version, VersionModel.updated_at).where(
+        VersionModel.user_id == user_id, VersionModel.resource == table_name
+    )
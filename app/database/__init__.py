@@ -1,9 +1,9 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from .base import Base
+from .pool import engine_options, instrument
 from sqlalchemy.exc import IntegrityError
-from ..models import User
 from ..core.security import hash_password
+from ..core.metrics import instrument_engine
 from datetime import datetime
 from dotenv import load_dotenv
 import os
@@ -11,10 +11,38 @@ import os
 load_dotenv()
 
 URI_DATABASE = os.getenv("URI_DATABASE")
+ADMIN_EMAIL = "admin@easyoutlays.com"
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "false").lower() in ("1", "true", "yes")
 
-engine = create_engine(URI_DATABASE)
+# Driver asíncrono equivalente a cada driver síncrono soportado
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def async_database_uri(uri: str) -> str:
+    scheme, sep, rest = uri.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+ASYNC_URI_DATABASE = os.getenv("ASYNC_URI_DATABASE") or async_database_uri(URI_DATABASE)
+
+engine = create_engine(URI_DATABASE, **engine_options(URI_DATABASE))
+instrument(engine)
+instrument_engine(engine)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    async_engine = create_async_engine(ASYNC_URI_DATABASE, **engine_options(ASYNC_URI_DATABASE, is_async=True))
+    instrument(async_engine.sync_engine)
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 def get_db():
     db = SessionLocal()
@@ -23,18 +51,26 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    # Importes locales: app.models importa app.database.base y este paquete se inicializa antes
+    from ..models import User
+    from .migrations import ensure_schema
+
+    ensure_schema(engine)
 
     # Crear usuario administrador si no existe
     db = SessionLocal()
     try:
-        admin_user = db.query(User).filter_by(email="admin").first()
+        admin_user = db.query(User).filter_by(email=ADMIN_EMAIL).first()
         if not admin_user:
             admin_user = User(
                 first_name="Admin",
                 last_name="User",
-                email="admin@easyoutlays.com",
+                email=ADMIN_EMAIL,
                 password=hash_password("admin"),  # Hashea la contraseña
                 role="admin",
                 status="active",
@@ -0,0 +1,127 @@
+import hashlib
+import logging
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import select, insert, delete
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from .base import Base
+from ..models import SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+# Migraciones de esquema en orden; cada versión se aplica una sola vez y queda
+# registrada en schema_migrations. create_all solo crea tablas nuevas, no añade
+# índices a tablas que ya existen.
+
+def create_indexes(connection, *table_names: str):
+    for name in table_names:
+        for index in Base.metadata.tables[name].indexes:
+            index.create(bind=connection, checkfirst=True)
+
+def create_tables(connection, *table_names: str):
+    for name in table_names:
+        Base.metadata.tables[name].create(bind=connection, checkfirst=True)
+
+def composite_indexes(connection):
+    create_indexes(
+        connection,
+        "users", "user_movements", "fixed_incomes", "variable_incomes", "fixed_expenses",
+        "variable_expenses", "savings", "debts", "goals", "fixed_investments",
+        "variable_investments", "user_money",
+    )
+
+def user_financial_summary(connection):
+    # Las filas se crean bajo demanda (app/core/summary.py)
+    create_tables(connection, "user_financial_summary")
+
+def trend_moments(connection):
+    create_tables(connection, "trend_moments")
+
+def admin_jobs(connection):
+    create_tables(connection, "admin_jobs")
+
+def user_movements_archive(connection):
+    create_tables(connection, "user_movements_archive")
+
+def resource_versions(connection):
+    create_tables(connection, "resource_versions")
+
+def trend_moments_axis(connection):
+    # El eje pasa a días enteros de la fecha de negocio: los momentos guardados se
+    # descartan y se recalculan en la siguiente lectura o escritura de cada recurso
+    connection.execute(delete(Base.metadata.tables["trend_moments"]))
+
+MIGRATIONS = [
+    ("0001_composite_indexes", composite_indexes),
+    ("0002_user_financial_summary", user_financial_summary),
+    ("0003_trend_moments", trend_moments),
+    ("0004_admin_jobs", admin_jobs),
+    ("0005_user_movements_archive", user_movements_archive),
+    ("0006_resource_versions", resource_versions),
+    ("0007_trend_moments_axis", trend_moments_axis),
+]
+
+def applied_versions(connection) -> set:
+    return set(connection.execute(select(SchemaMigration.version)).scalars())
+
+def run_migrations(engine):
+    SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+    with engine.connect() as connection:
+        applied = applied_versions(connection)
+    for version, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            with engine.begin() as connection:
+                migrate(connection)
+                connection.execute(insert(SchemaMigration).values(version=version, applied_at=datetime.utcnow()))
+        except DBAPIError:
+            # Otra instancia pudo aplicar la misma migración a la vez
+            with engine.connect() as connection:
+                if version not in applied_versions(connection):
+                    raise
+            continue
+        logger.info("Applied migration %s", version)
+
+@lru_cache(maxsize=None)
+def schema_fingerprint() -> str:
+    # Huella del esquema declarado (tablas, columnas, índices, claves) y de las migraciones conocidas
+    parts = []
+    for table in sorted(Base.metadata.tables.values(), key=lambda table: table.name):
+        parts.append(table.name)
+        for column in table.columns:
+            targets = ",".join(sorted(key.target_fullname for key in column.foreign_keys))
+            parts.append(f"{column.name}:{column.type!r}:{column.nullable}:{column.primary_key}:{targets}")
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            parts.append(f"{index.name}:{','.join(column.name for column in index.columns)}:{index.unique}")
+    parts.extend(version for version, _ in MIGRATIONS)
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()[:32]
+
+_verified = set()
+
+def ensure_schema(engine) -> bool:
+    # Sustituye a create_all en cada arranque: si la huella ya está registrada basta
+    # una consulta por clave primaria; si no, create_all + migraciones y se registra.
+    version = f"schema-{schema_fingerprint()}"
+    key = (engine.url.render_as_string(hide_password=True), version)
+    if key in _verified:
+        return False
+    try:
+        with engine.connect() as connection:
+            current = connection.execute(
+                select(SchemaMigration.version).where(SchemaMigration.version == version)
+            ).first() is not None
+    except DBAPIError:
+        # Base nueva: todavía no existe schema_migrations
+        current = False
+    if not current:
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+        try:
+            with engine.begin() as connection:
+                connection.execute(insert(SchemaMigration).values(version=version, applied_at=datetime.utcnow()))
+        except IntegrityError:
+            pass
+        logger.info("Schema %s applied", version)
+    _verified.add(key)
+    return not current
@@ -1,10 +1,34 @@
 from fastapi import FastAPI
-from app.database import SessionLocal, init_db
-from app.routers import auth, user, admin
+from fastapi.responses import PlainTextResponse
+from slowapi.errors import RateLimitExceeded
+from slowapi.middleware import SlowAPIASGIMiddleware
+from app.database import SessionLocal, init_db, async_engine, DATABASE_ASYNC
+from app.routers import auth, admin, analysis
 from app.core.scheduler import scheduler
+from app.core.leader import release as release_scheduler_lease
+from app.core.security import shutdown_hash_pool
+from app.core.forecast import shutdown_forecast_pool
+from app.core.movements import stop_writer as stop_movements_writer
+from app.core.ratelimit import limiter, rate_limit_exceeded
+from app.core.metrics import METRICS_ENABLED, MetricsMiddleware, render as render_metrics
+
+# Solo se importa (y se construye) el router /user que se va a montar
+if DATABASE_ASYNC:
+    from app.routers import user_async as user
+else:
+    from app.routers import user
 
 app = FastAPI()
 
+# Límite global por usuario en el middleware; /auth lleva límites propios por IP
+app.state.limiter = limiter
+app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded)
+app.add_middleware(SlowAPIASGIMiddleware)
+
+# Por fuera del limitador: las respuestas 429 también se miden
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -22,14 +46,32 @@ def on_startup():
 def on_shutdown():
     if scheduler.running:
         scheduler.shutdown()
+        release_scheduler_lease()
+    shutdown_hash_pool()
+    shutdown_forecast_pool()
+    stop_movements_writer()
+
+@app.on_event("shutdown")
+async def close_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
 
 @app.get("/")
+@limiter.exempt
 async def read_root():
     return {"message": "Hola mundo"}
 
+if METRICS_ENABLED:
+    # async: se lee en el hilo del event loop, el mismo que escribe las series
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    @limiter.exempt
+    async def read_metrics():
+        return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(user.router, prefix="/user", tags=["user"])
 app.include_router(admin.router, prefix="/admin", tags=["admin"])
+app.include_router(analysis.router, tags=["analysis"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,9 +1,12 @@
-from sqlalchemy import Column, ForeignKey, Integer, String, DECIMAL, TIMESTAMP, DATE
+from sqlalchemy import Column, ForeignKey, Index, Integer, String, DECIMAL, TIMESTAMP, DATE, Double
 
 from ..database.base import Base
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        Index("ix_users_created_at", "created_at", "user_id"),
+    )
     user_id = Column(Integer, primary_key=True, autoincrement=True)
     first_name = Column(String(255), nullable=False)
     last_name = Column(String(255), nullable=False)
@@ -16,13 +19,32 @@ class User(Base):
 
 class UserMovements(Base):
     __tablename__ = 'user_movements'
+    __table_args__ = (
+        Index("ix_user_movements_user_created", "user_id", "created_at"),
+    )
     movement_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     description = Column(String(255), nullable=False)
     created_at = Column(TIMESTAMP, nullable=False)
 
+class UserMovementsArchive(Base):
+    # Movimientos antiguos movidos por el job de retención (app/core/retention.py); mismas columnas
+    __tablename__ = 'user_movements_archive'
+    __table_args__ = (
+        Index("ix_user_movements_archive_user_created", "user_id", "created_at"),
+        {"mysql_row_format": "COMPRESSED"},
+    )
+    movement_id = Column(Integer, primary_key=True, autoincrement=False)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    description = Column(String(255), nullable=False)
+    created_at = Column(TIMESTAMP, nullable=False)
+
 class FixedIncome(Base):
     __tablename__ = 'fixed_incomes'
+    __table_args__ = (
+        Index("ix_fixed_incomes_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_fixed_incomes_status_updated", "status", "updated_at"),
+    )
     fixed_income_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -34,6 +56,10 @@ class FixedIncome(Base):
 
 class VariableIncome(Base):
     __tablename__ = 'variable_incomes'
+    __table_args__ = (
+        Index("ix_variable_incomes_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_variable_incomes_user_status_received", "user_id", "status", "received_date"),
+    )
     variable_income_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -45,6 +71,10 @@ class VariableIncome(Base):
 
 class FixedExpense(Base):
     __tablename__ = 'fixed_expenses'
+    __table_args__ = (
+        Index("ix_fixed_expenses_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_fixed_expenses_status_updated", "status", "updated_at"),
+    )
     fixed_expense_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -56,6 +86,10 @@ class FixedExpense(Base):
 
 class VariableExpense(Base):
     __tablename__ = 'variable_expenses'
+    __table_args__ = (
+        Index("ix_variable_expenses_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_variable_expenses_user_status_paid", "user_id", "status", "paid_date"),
+    )
     variable_expense_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -67,6 +101,9 @@ class VariableExpense(Base):
 
 class Saving(Base):
     __tablename__ = 'savings'
+    __table_args__ = (
+        Index("ix_savings_user_status_created", "user_id", "status", "created_at"),
+    )
     saving_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -77,6 +114,9 @@ class Saving(Base):
 
 class Debt(Base):
     __tablename__ = 'debts'
+    __table_args__ = (
+        Index("ix_debts_user_status_created", "user_id", "status", "created_at"),
+    )
     debt_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -92,6 +132,9 @@ class Debt(Base):
 
 class Goal(Base):
     __tablename__ = 'goals'
+    __table_args__ = (
+        Index("ix_goals_user_status_created", "user_id", "status", "created_at"),
+    )
     goal_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -103,6 +146,9 @@ class Goal(Base):
 
 class FixedInvestment(Base):
     __tablename__ = 'fixed_investments'
+    __table_args__ = (
+        Index("ix_fixed_investments_user_status_created", "user_id", "status", "created_at"),
+    )
     fixed_investment_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -116,6 +162,10 @@ class FixedInvestment(Base):
 
 class VariableInvestment(Base):
     __tablename__ = 'variable_investments'
+    __table_args__ = (
+        Index("ix_variable_investments_user_status_created", "user_id", "status", "created_at"),
+        Index("ix_variable_investments_user_status_start", "user_id", "status", "start_date"),
+    )
     variable_investment_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     name = Column(String(255), nullable=False)
@@ -131,9 +181,75 @@ class VariableInvestment(Base):
 
 class UserMoney(Base):
     __tablename__ = 'user_money'
+    __table_args__ = (
+        Index("ix_user_money_user_status", "user_id", "status"),
+    )
     user_money_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
     amount = Column(DECIMAL(10, 2), nullable=False)
     status = Column(String(255), nullable=False)
     created_at = Column(TIMESTAMP, nullable=False)
-    updated_at = Column(TIMESTAMP, nullable=False)
\ No newline at end of file
+    updated_at = Column(TIMESTAMP, nullable=False)
+
+class UserFinancialSummary(Base):
+    __tablename__ = 'user_financial_summary'
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True)
+    balance = Column(DECIMAL(14, 2), nullable=False)
+    fixed_income_monthly = Column(DECIMAL(14, 2), nullable=False)
+    fixed_expense_monthly = Column(DECIMAL(14, 2), nullable=False)
+    variable_income_total = Column(DECIMAL(14, 2), nullable=False)
+    variable_expense_total = Column(DECIMAL(14, 2), nullable=False)
+    savings_total = Column(DECIMAL(14, 2), nullable=False)
+    debt_total = Column(DECIMAL(14, 2), nullable=False)
+    invested_total = Column(DECIMAL(14, 2), nullable=False)
+    goal_target_total = Column(DECIMAL(14, 2), nullable=False)
+    goal_saved_total = Column(DECIMAL(14, 2), nullable=False)
+    updated_at = Column(TIMESTAMP, nullable=False)
+
+class TrendMoments(Base):
+    __tablename__ = 'trend_moments'
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True)
+    resource = Column(String(64), primary_key=True)
+    n = Column(Integer, nullable=False)
+    sx = Column(Double, nullable=False)
+    sy = Column(Double, nullable=False)
+    sxy = Column(Double, nullable=False)
+    sxx = Column(Double, nullable=False)
+    syy = Column(Double, nullable=False)
+    first_at = Column(TIMESTAMP, nullable=True)
+    last_at = Column(TIMESTAMP, nullable=True)
+    updated_at = Column(TIMESTAMP, nullable=False)
+
+class ResourceVersion(Base):
+    __tablename__ = 'resource_versions'
+    user_id = Column(Integer, ForeignKey('users.user_id'), primary_key=True)
+    resource = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False)
+    updated_at = Column(TIMESTAMP, nullable=False)
+
+class SchedulerLease(Base):
+    __tablename__ = 'scheduler_leases'
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    acquired_at = Column(TIMESTAMP, nullable=False)
+    heartbeat_at = Column(TIMESTAMP, nullable=False)
+    expires_at = Column(TIMESTAMP, nullable=False)
+
+class AdminJob(Base):
+    __tablename__ = 'admin_jobs'
+    __table_args__ = (
+        Index("ix_admin_jobs_user_status", "user_id", "status"),
+    )
+    job_id = Column(String(32), primary_key=True)
+    kind = Column(String(64), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.user_id'), nullable=False)
+    status = Column(String(32), nullable=False)
+    error = Column(String(1024), nullable=True)
+    created_at = Column(TIMESTAMP, nullable=False)
+    started_at = Column(TIMESTAMP, nullable=True)
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+class SchemaMigration(Base):
+    __tablename__ = 'schema_migrations'
+    version = Column(String(64), primary_key=True)
+    applied_at = Column(TIMESTAMP, nullable=False)
\ No newline at end of file
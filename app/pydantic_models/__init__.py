@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, date
 from decimal import Decimal
 
@@ -31,6 +31,7 @@ class TokenData(BaseModel):
     email: Optional[str] = None
 
 class UserMovements(BaseModel):
+    movement_id: int
     user_id: int
     description: str
     created_at: datetime
@@ -132,6 +133,110 @@ class UserMoney(BaseModel):
     created_at: datetime
     updated_at: datetime
 
+class UserFinancialSummary(BaseModel):
+    user_id: int
+    balance: Decimal
+    fixed_income_monthly: Decimal
+    fixed_expense_monthly: Decimal
+    variable_income_total: Decimal
+    variable_expense_total: Decimal
+    savings_total: Decimal
+    debt_total: Decimal
+    invested_total: Decimal
+    goal_target_total: Decimal
+    goal_saved_total: Decimal
+    goal_progress: Optional[float] = None
+    updated_at: datetime
+
+class FixedIncomeCreate(BaseModel):
+    name: str
+    amount: float
+    frequency: int
+    status: str = "active"
+
+class VariableIncomeCreate(BaseModel):
+    name: str
+    amount: float
+    received_date: datetime
+    status: str = "active"
+
+class FixedExpenseCreate(BaseModel):
+    name: str
+    amount: float
+    frequency: int
+    status: str = "active"
+
+class VariableExpenseCreate(BaseModel):
+    name: str
+    amount: float
+    paid_date: datetime
+    status: str = "active"
+
+class SavingCreate(BaseModel):
+    name: str
+    amount: float
+    status: str = "active"
+
+class DebtCreate(BaseModel):
+    name: str
+    amount: float
+    payment: float
+    interest_rate: float
+    interest_type: str
+    interest_period_days: int
+    interest_free_months: int
+    status: str = "active"
+
+class GoalCreate(BaseModel):
+    name: str
+    amount: float
+    saved_amount: float
+    status: str = "active"
+
+class FixedInvestmentCreate(BaseModel):
+    name: str
+    amount: float
+    interest_rate: float
+    interest_type: str
+    interest_period_days: int
+    status: str = "active"
+
+class VariableInvestmentCreate(BaseModel):
+    name: str
+    amount: float
+    interest_rate: float
+    interest_type: str
+    interest_period_days: int
+    start_date: datetime
+    end_date: datetime
+    status: str = "active"
+
+class UserMoneyCreate(BaseModel):
+    amount: float
+    status: str = "active"
+
+class BulkItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: str
+
+class BulkResult(BaseModel):
+    processed: int
+    results: List[BulkItemResult]
+
+class Message(BaseModel):
+    message: str
+
+class AdminJob(BaseModel):
+    job_id: str
+    kind: str
+    user_id: int
+    status: str
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
 class UserResponse(BaseModel):
     user_id: int
     first_name: str
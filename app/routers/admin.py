@@ -1,32 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import List
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from datetime import datetime
-from ..database import get_db
-from ..models import User as UserModel, FixedIncome as FixedIncomeModel, VariableIncome as VariableIncomeModel, FixedExpense as FixedExpenseModel, VariableExpense as VariableExpenseModel, Saving as SavingModel, Debt as DebtModel, Goal as GoalModel, FixedInvestment as FixedInvestmentModel, VariableInvestment as VariableInvestmentModel, UserMoney as UserMoneyModel
-from ..core.security import hash_password
-from ..routers.auth import get_admin_user
-from ..pydantic_models import User, UserCreate, UserUpdate, UserResponse
+from ..database import get_db, engine, async_engine, SessionLocal
+from ..database.pool import pool_status
+from ..models import User as UserModel, AdminJob as AdminJobModel
+from ..core.security import hash_password_async
+from ..routers.auth import get_admin_user, invalidate_principal, principal_cache, find_user, save_user
+from ..core.leader import lease_status
+from ..core import cascade, debts
+from ..core.admission import admit, controller as admission_controller, COST_BCRYPT, COST_CASCADE
+from ..core.ratelimit import rate_limit_status
+from ..core.investments import curve_cache
+from ..core.forecast import forecast_cache
+from ..core.movements import writer as movements_writer
+from ..core.pagination import LIST_MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate, split_page
+from ..pydantic_models import AdminJob, Message, User, UserCreate, UserUpdate, UserResponse
 
 router = APIRouter()
 
-def inactivate_records(db: Session, model, user_id: int):
-    records = db.query(model).filter(model.user_id == user_id).all()
-    for record in records:
-        record.status = "inactive"
-        record.updated_at = datetime.utcnow()
-    db.commit()
-
-def reactivate_records(db: Session, model, user_id: int):
-    records = db.query(model).filter(model.user_id == user_id).all()
-    for record in records:
-        record.status = "active"
-        record.updated_at = datetime.utcnow()
-    db.commit()
-
 @router.get("/users", response_model=List[User])
-def read_users(skip: int = 0, limit: int = 10, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
-    users = db.query(UserModel).offset(skip).limit(limit).all()
+def read_users(response: Response, skip: int = 0, limit: int = Query(10, ge=1, le=LIST_MAX_PAGE_SIZE), cursor: str | None = None, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
+    # skip se mantiene por compatibilidad; con cursor la paginación es por (created_at, user_id)
+    stmt = paginate(select(UserModel), UserModel.created_at, UserModel.user_id, cursor, limit)
+    if not cursor and skip:
+        stmt = stmt.offset(skip)
+    users = db.execute(stmt).scalars().all()
+    users, next_cursor = split_page(users, limit, lambda user: (user.created_at, user.user_id))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 @router.get("/users/{user_id}", response_model=User)
@@ -36,12 +43,12 @@ def read_user(user_id: int, db: Session = Depends(get_db), current_user: UserMod
         raise HTTPException(status_code=404, detail="err_user_not_found")
     return db_user
 
-@router.post("/users", response_model=UserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
-    db_user = db.query(UserModel).filter(UserModel.email == user.email).first()
+@router.post("/users", response_model=UserResponse, dependencies=[Depends(admit("admin.create_user", COST_BCRYPT))])
+async def create_user(user: UserCreate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
+    db_user = await run_in_threadpool(find_user, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="err_email_already_registered")
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password_async(user.password)
     new_user = UserModel(
         first_name=user.first_name,
         last_name=user.last_name,
@@ -52,16 +59,14 @@ def create_user(user: UserCreate, db: Session = Depends(get_db), current_user: U
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return new_user
+    return await run_in_threadpool(save_user, db, new_user)
 
 @router.put("/users/{user_id}", response_model=User)
 def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
     db_user = db.query(UserModel).filter(UserModel.user_id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="err_user_not_found")
+    previous_email = db_user.email
     db_user.first_name = user.first_name
     db_user.last_name = user.last_name
     db_user.email = user.email
@@ -70,10 +75,28 @@ def update_user(user_id: int, user: UserUpdate, db: Session = Depends(get_db), c
     db_user.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(db_user)
+    invalidate_principal(db_user.user_id, previous_email)
     return db_user
 
-@router.delete("/users/{user_id}", response_model=User)
-def delete_user(user_id: int, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
+def cascade_user_status(db: Session, db_user: UserModel, kind: str, background_tasks: BackgroundTasks):
+    # Cuentas grandes: job en segundo plano con su estado en /admin/jobs/{job_id}
+    user_id, email = db_user.user_id, db_user.email
+    job = cascade.active_job(db, user_id)
+    # Un job de la operación contraria aún no terminado: esta no se puede encolar detrás
+    if job is not None and job.kind != kind:
+        raise HTTPException(status_code=409, detail="err_job_in_progress")
+    if job is None and cascade.exceeds_background_rows(db, user_id):
+        job = cascade.create_job(db, kind, user_id)
+        background_tasks.add_task(cascade.run_job, job.job_id, kind, user_id, lambda: invalidate_principal(user_id, email))
+    if job is not None:
+        return JSONResponse(status_code=202, content=jsonable_encoder(AdminJob.model_validate(job, from_attributes=True)))
+    cascade.set_user_status(db, user_id, cascade.KINDS[kind])
+    db.commit()
+    invalidate_principal(user_id, email)
+    return None
+
+@router.delete("/users/{user_id}", response_model=Message, dependencies=[Depends(admit("admin.delete_user", COST_CASCADE))])
+def delete_user(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
     db_user = db.query(UserModel).filter(UserModel.user_id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="err_user_not_found")
@@ -81,42 +104,71 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: UserM
     if current_user.user_id == user_id and current_user.role == "admin":
         raise HTTPException(status_code=401, detail= "err_admin_cannot_delete_self")
 
-    inactivate_records(db, FixedIncomeModel, user_id)
-    inactivate_records(db, VariableIncomeModel, user_id)
-    inactivate_records(db, FixedExpenseModel, user_id)
-    inactivate_records(db, VariableExpenseModel, user_id)
-    inactivate_records(db, SavingModel, user_id)
-    inactivate_records(db, DebtModel, user_id)
-    inactivate_records(db, GoalModel, user_id)
-    inactivate_records(db, FixedInvestmentModel, user_id)
-    inactivate_records(db, VariableInvestmentModel, user_id)
-    inactivate_records(db, UserMoneyModel, user_id)
-
-    db_user.status = "inactive"
-    db_user.updated_at = datetime.utcnow()
-    db.commit()
-    db.refresh(db_user)
+    accepted = cascade_user_status(db, db_user, "delete_user", background_tasks)
+    if accepted is not None:
+        return accepted
     return {"message": "OK"}
 
-@router.put("/users/{user_id}/reactivate", response_model=User)
-def reactivate_user(user_id: int, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
+@router.put("/users/{user_id}/reactivate", response_model=User, dependencies=[Depends(admit("admin.reactivate_user", COST_CASCADE))])
+def reactivate_user(user_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
     db_user = db.query(UserModel).filter(UserModel.user_id == user_id).first()
     if not db_user:
         raise HTTPException(status_code=404, detail="err_user_not_found")
     
-    reactivate_records(db, FixedIncomeModel, user_id)
-    reactivate_records(db, VariableIncomeModel, user_id)
-    reactivate_records(db, FixedExpenseModel, user_id)
-    reactivate_records(db, VariableExpenseModel, user_id)
-    reactivate_records(db, SavingModel, user_id)
-    reactivate_records(db, DebtModel, user_id)
-    reactivate_records(db, GoalModel, user_id)
-    reactivate_records(db, FixedInvestmentModel, user_id)
-    reactivate_records(db, VariableInvestmentModel, user_id)
-    reactivate_records(db, UserMoneyModel, user_id)
-
-    db_user.status = "active"
-    db_user.updated_at = datetime.utcnow()
-    db.commit()
+    accepted = cascade_user_status(db, db_user, "reactivate_user", background_tasks)
+    if accepted is not None:
+        return accepted
     db.refresh(db_user)
-    return db_user
\ No newline at end of file
+    return db_user
+
+@router.get("/jobs/{job_id}", response_model=AdminJob)
+def read_job(job_id: str, db: Session = Depends(get_db), current_user: UserModel = Depends(get_admin_user)):
+    job = db.get(AdminJobModel, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="err_job_not_found")
+    return job
+
+@router.get("/scheduler/lease")
+def read_scheduler_lease(current_user: UserModel = Depends(get_admin_user)):
+    return lease_status()
+
+@router.get("/cache/principals")
+def read_principal_cache_stats(current_user: UserModel = Depends(get_admin_user)):
+    return principal_cache.stats()
+
+@router.get("/cache/investments")
+def read_investment_cache_stats(current_user: UserModel = Depends(get_admin_user)):
+    return curve_cache.stats()
+
+@router.get("/cache/forecasts")
+def read_forecast_cache_stats(current_user: UserModel = Depends(get_admin_user)):
+    return forecast_cache.stats()
+
+@router.get("/movements/writer")
+def read_movements_writer_status(current_user: UserModel = Depends(get_admin_user)):
+    return movements_writer.status()
+
+@router.get("/admission")
+def read_admission_status(current_user: UserModel = Depends(get_admin_user)):
+    return {"admission": admission_controller.status(), "rate_limits": rate_limit_status()}
+
+@router.get("/db/pool")
+def read_db_pool_stats(current_user: UserModel = Depends(get_admin_user)):
+    return {"sync": pool_status(engine), "async": pool_status(async_engine.sync_engine if async_engine else None)}
+
+def debt_projection_chunks(chunk_users: int, max_months: int):
+    # Sesión propia: el streaming empieza después de cerrar las dependencias
+    db = SessionLocal()
+    try:
+        for projections in debts.project_all(db, chunk_users, max_months):
+            yield "".join(json.dumps(projection) + "\n" for projection in projections)
+    finally:
+        db.close()
+
+@router.get("/debts/projection")
+def debt_projection_batch(
+    chunk_users: int = Query(debts.DEBT_PROJECTION_CHUNK_USERS, ge=1, le=10000),
+    max_months: int = Query(debts.DEBT_PROJECTION_MAX_MONTHS, ge=1, le=1200),
+    current_user: UserModel = Depends(get_admin_user),
+):
+    return StreamingResponse(debt_projection_chunks(chunk_users, max_months), media_type="application/x-ndjson")
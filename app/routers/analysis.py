@@ -1,67 +1,91 @@
 from fastapi import APIRouter, Depends, HTTPException
+from typing import Literal
+from sqlalchemy import select, func
 from sqlalchemy.orm import Session
-from sklearn.linear_model import LinearRegression
-import numpy as np
-from datetime import datetime
 from ..database import get_db
-from ..models import (
-    FixedIncome as FixedIncomeModel,
-    VariableIncome as VariableIncomeModel,
-    FixedExpense as FixedExpenseModel,
-    VariableExpense as VariableExpenseModel,
-    Saving as SavingModel,
-    Debt as DebtModel,
-    Goal as GoalModel,
-    FixedInvestment as FixedInvestmentModel,
-    VariableInvestment as VariableInvestmentModel,
-)
+from ..models import User
+from ..routers.auth import get_current_user
+from ..core import moments
+from ..core.admission import admit, COST_ANALYSIS
+from .resources import RESOURCES
 
 router = APIRouter()
 
-def calculate_trend(data):
-    x = np.array([i for i in range(len(data))]).reshape(-1, 1)  # Índices como variable independiente
-    y = np.array(data).reshape(-1, 1)  # Valores como variable dependiente
+MIN_RECORDS = 10
 
-    model = LinearRegression()
-    model.fit(x, y)
+ANALYSIS_RESOURCES = {resource.path: resource for resource in RESOURCES if not resource.singleton}
 
-    m = model.coef_[0][0]  # Pendiente
-    b = model.intercept_[0]  # Intersección
-    return f"y = {m:.2f}x + {b:.2f}"
-
-@router.get("/analysis/{table_name}")
-def analyze_table(table_name: str, db: Session = Depends(get_db)):
-    table_mapping = {
-        "fixed_incomes": FixedIncomeModel,
-        "variable_incomes": VariableIncomeModel,
-        "fixed_expenses": FixedExpenseModel,
-        "variable_expenses": VariableExpenseModel,
-        "savings": SavingModel,
-        "debts": DebtModel,
-        "goals": GoalModel,
-        "fixed_investments": FixedInvestmentModel,
-        "variable_investments": VariableInvestmentModel,
-    }
-
-    if table_name not in table_mapping:
+def analysis_resource(table_name: str):
+    if table_name not in ANALYSIS_RESOURCES:
         raise HTTPException(status_code=400, detail="Tabla no válida para análisis")
+    return ANALYSIS_RESOURCES[table_name]
 
-    model = table_mapping[table_name]
-    records = db.query(model).filter(model.status == "active").order_by(model.created_at).all()
+def index_regression_sums(db: Session, resource, user_id: int):
+    # Una sola consulta agregada: n, Σx, Σy, Σxy, Σx² con x = índice 0..n-1 por created_at.
+    # El índice cambia al borrar filas, por eso este eje no usa los momentos guardados.
+    model = resource.model
+    x = func.row_number().over(order_by=(model.created_at, resource.pk)) - 1
+    points = (
+        select(x.label("x"), model.amount.label("y"))
+        .where(model.user_id == user_id, model.status == "active")
+        .subquery()
+    )
+    return db.execute(
+        select(
+            func.count(),
+            func.sum(points.c.x),
+            func.sum(points.c.y),
+            func.sum(points.c.x * points.c.y),
+            func.sum(points.c.x * points.c.x),
+        ).select_from(points)
+    ).one()
 
-    if len(records) < 10:
+def calculate_trend(n: int, sx: float, sy: float, sxy: float, sxx: float):
+    # Mínimos cuadrados ordinarios a partir de las sumas
+    denominator = n * sxx - sx * sx
+    if denominator == 0:
+        return None
+    m = (n * sxy - sx * sy) / denominator  # Pendiente
+    b = (sy - m * sx) / n  # Intersección
+    return m, b
+
+@router.get("/analysis/{table_name}", dependencies=[Depends(admit("analysis.trend", COST_ANALYSIS))])
+def analyze_table(
+    table_name: str,
+    axis: Literal["index", "time"] = "index",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    resource = analysis_resource(table_name)
+    if axis == "time":
+        # Eje temporal (días de la fecha de negocio desde el primer registro): momentos guardados, tiempo constante
+        row = moments.read(db, current_user.user_id, resource.table_name)
+        n = row.n
+        trend = moments.trend(row)
+    else:
+        n, sx, sy, sxy, sxx = index_regression_sums(db, resource, current_user.user_id)
+        trend = calculate_trend(n, float(sx or 0), float(sy or 0), float(sxy or 0), float(sxx or 0)) if n else None
+    if n < MIN_RECORDS:
         raise HTTPException(
             status_code=422,
             detail="Se requieren al menos 10 registros para calcular la tendencia"
         )
-
-    if hasattr(model, "amount"):
-        data = [record.amount for record in records]
-    else:
+    if trend is None:
         raise HTTPException(
-            status_code=400,
-            detail="La tabla no tiene un campo 'amount' para analizar"
+            status_code=422,
+            detail="Los registros no tienen variación en el eje para calcular la tendencia"
         )
+    m, b = trend
+    return {"table": table_name, "axis": axis, "trend_equation": f"y = {m:.2f}x + {b:.2f}"}
 
-    trend_equation = calculate_trend(data)
-    return {"table": table_name, "trend_equation": trend_equation}
\ No newline at end of file
+@router.get("/analysis/{table_name}/stats", dependencies=[Depends(admit("analysis.stats", COST_ANALYSIS))])
+def table_statistics(table_name: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+    resource = analysis_resource(table_name)
+    row = moments.read(db, current_user.user_id, resource.table_name)
+    trend = moments.trend(row)
+    return dict(
+        moments.statistics(row),
+        table=table_name,
+        slope_per_day=trend[0] if trend else None,
+        intercept=trend[1] if trend else None,
+    )
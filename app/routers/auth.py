@@ -1,26 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, EmailStr
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from ..database import get_db
 from ..models import User
-from ..core.security import hash_password, verify_password
+from ..core.security import hash_password_async, verify_and_update_password_async
+from ..core.cache import TTLCache
+from ..core.admission import admit, COST_BCRYPT
+from ..core.ratelimit import limiter, ip_key, AUTH_RATE_LIMIT
 from dotenv import load_dotenv
 import os
+import threading
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRATION_MINUTES = 30
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
 
 router = APIRouter()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# La caché es de cada proceso: invalidate_principal solo limpia la del worker que atiende
+# la petición de administración. En los demás workers un usuario desactivado (o con otro
+# rol) sigue aceptado hasta PRINCIPAL_CACHE_TTL_SECONDS; ese es el retraso máximo.
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_ENTRIES, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+# Cada invalidación incrementa la generación; un fallo de caché que empezó antes no
+# guarda su copia (leída antes del cambio) encima de la invalidación
+principal_generation = 0
+principal_generation_lock = threading.Lock()
 
 class Token(BaseModel):
     access_token: str
@@ -40,6 +53,22 @@ class UserLogin(BaseModel):
     email: str
     password: str
 
+class Principal:
+    # Copia del usuario autenticado que no depende de la sesión de la base de datos
+    __slots__ = ("user_id", "first_name", "last_name", "email", "role", "status", "created_at", "updated_at")
+
+    def __init__(self, user: User):
+        for field in self.__slots__:
+            setattr(self, field, getattr(user, field))
+
+def invalidate_principal(user_id: int, email: str | None = None):
+    global principal_generation
+    with principal_generation_lock:
+        principal_generation += 1
+    principal_cache.pop(user_id)
+    if email is not None:
+        principal_cache.pop(email)
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,12 +83,21 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
+    cache_key = payload.get("user_id") or token_data.email
+    principal = principal_cache.get(cache_key)
+    if principal is not None and principal.email == token_data.email:
+        return principal
+    generation = principal_generation
     user = db.query(User).filter(User.email == token_data.email).first()
-    if user is None:
+    if user is None or user.status == "inactive":
         raise credentials_exception
-    return user
+    principal = Principal(user)
+    with principal_generation_lock:
+        if generation == principal_generation:
+            principal_cache.set(cache_key, principal)
+    return principal
 
-def get_admin_user(current_user: User = Depends(get_current_user)):
+def get_admin_user(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -77,12 +115,25 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-@router.post("/register", response_model=Token, status_code=status.HTTP_200_OK)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+def find_user(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+def save_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+# Handlers async: bcrypt se espera sobre el pool de procesos sin retener un hilo del
+# threadpool; las consultas (cortas) van al threadpool con run_in_threadpool.
+# bcrypt: límite por IP (todavía no hay usuario) y admisión con coste alto
+@router.post("/register", response_model=Token, status_code=status.HTTP_200_OK, dependencies=[Depends(admit("auth.register", COST_BCRYPT))])
+@limiter.limit(AUTH_RATE_LIMIT, key_func=ip_key)
+async def register(request: Request, user: UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(find_user, db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="err_email_already_registered")
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password_async(user.password)
     new_user = User(
         first_name=user.first_name,
         last_name=user.last_name,
@@ -93,20 +144,24 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         created_at=datetime.utcnow(),
         updated_at=datetime.utcnow()
     )
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    new_user = await run_in_threadpool(save_user, db, new_user)
     access_token = create_access_token(data={"sub": new_user.email, "user_id": new_user.user_id, "role": new_user.role})
     return {"access_token": access_token, "token_type": "bearer"}
 
-@router.post("/login", response_model=Token, status_code=status.HTTP_200_OK)
-def login(user: UserLogin, db: Session = Depends(get_db)):
-    db_user = db.query(User).filter(User.email == user.email).first()
+@router.post("/login", response_model=Token, status_code=status.HTTP_200_OK, dependencies=[Depends(admit("auth.login", COST_BCRYPT))])
+@limiter.limit(AUTH_RATE_LIMIT, key_func=ip_key)
+async def login(request: Request, user: UserLogin, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(find_user, db, user.email)
     if not db_user:
         raise HTTPException(status_code=400, detail="err_user_not_found")
-    if not verify_password(user.password, db_user.password):
+    verified, new_hash = await verify_and_update_password_async(user.password, db_user.password)
+    if not verified:
         raise HTTPException(status_code=400, detail="err_incorrect_password")
     if db_user.status == "inactive":
         raise HTTPException(status_code=400, detail="err_inactive_user")
+    if new_hash:
+        # Rehash transparente cuando cambia la política de coste de bcrypt
+        db_user.password = new_hash
+        await run_in_threadpool(db.commit)
     access_token = create_access_token(data={"sub": db_user.email, "user_id": db_user.user_id, "role": db_user.role})
     return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
@@ -0,0 +1,59 @@
+import hashlib
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy.orm import Session
+from ..database import get_db, get_async_db
+from ..models import User
+from ..routers.auth import get_current_user
+from ..core.versions import version_statement
+
+# GET condicional para los listados de /user: el validador es la versión del recurso
+# para el usuario (app/core/versions.py), más la query string (cursor y filtros).
+# Si el cliente ya tiene esa versión se responde 304 sin leer ni serializar filas.
+# Sin fila de versión (ninguna escritura registrada todavía) la versión es 0.
+
+def validator_headers(request: Request, resource, user_id: int, version: int, last_modified) -> dict:
+    raw = f"{resource.path}|{user_id}|v{version}|{request.url.query}"
+    headers = {"ETag": f'W/"{hashlib.sha1(raw.encode()).hexdigest()}"'}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+    return headers
+
+def not_modified(request: Request, headers: dict, last_modified) -> bool:
+    # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or headers["ETag"].removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # Last-Modified tiene resolución de segundos
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+def check(request: Request, resource, user_id: int, row) -> dict:
+    version, last_modified = row or (0, None)
+    headers = validator_headers(request, resource, user_id, version, last_modified)
+    if not_modified(request, headers, last_modified):
+        raise HTTPException(status_code=304, headers=headers)
+    return headers
+
+def conditional_get(resource):
+    # Dependencia por recurso; devuelve las cabeceras que el handler añade a la respuesta 200
+    def dependency(request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)) -> dict:
+        row = db.execute(version_statement(current_user.user_id, resource.table_name)).first()
+        return check(request, resource, current_user.user_id, row)
+    return dependency
+
+def conditional_get_async(resource):
+    async def dependency(request: Request, db=Depends(get_async_db), current_user: User = Depends(get_current_user)) -> dict:
+        row = (await db.execute(version_statement(current_user.user_id, resource.table_name))).first()
+        return check(request, resource, current_user.user_id, row)
+    return dependency
@@ -0,0 +1,94 @@
+import csv
+import io
+import json
+import os
+from datetime import datetime, date, timezone
+from decimal import Decimal
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from dotenv import load_dotenv
+from ..database import SessionLocal
+from ..models import User, UserMovements as UserMovementsModel, UserMovementsArchive as UserMovementsArchiveModel
+from ..routers.auth import get_current_user
+from .resources import RESOURCES
+
+load_dotenv()
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+router = APIRouter()
+
+def export_sources():
+    # (nombre, tabla, columna de "since"); los recursos incluyen filas inactivas
+    for resource in RESOURCES:
+        yield resource.path, resource.model.__table__, resource.model.updated_at
+    # Movimientos archivados primero (los más antiguos) y después los activos, con el mismo nombre
+    yield "user_movements", UserMovementsArchiveModel.__table__, UserMovementsArchiveModel.created_at
+    yield "user_movements", UserMovementsModel.__table__, UserMovementsModel.created_at
+
+def export_columns() -> list:
+    # Unión de columnas de todas las tablas, en orden de aparición
+    columns = {}
+    for _, table, _ in export_sources():
+        columns.update(dict.fromkeys(table.columns.keys()))
+    return list(columns)
+
+def to_text(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def stream_rows(user_id: int, since: datetime | None):
+    # Sesión propia: la dependencia get_db se cierra antes de que empiece el streaming
+    db = SessionLocal()
+    try:
+        for name, table, since_column in export_sources():
+            stmt = select(*table.columns).where(table.c.user_id == user_id)
+            if since is not None:
+                stmt = stmt.where(since_column >= since)
+            stmt = stmt.order_by(*table.primary_key.columns).execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+            for partition in db.execute(stmt).mappings().partitions():
+                yield name, partition
+    finally:
+        db.close()
+
+def ndjson_chunks(user_id: int, since: datetime | None):
+    for name, rows in stream_rows(user_id, since):
+        yield "".join(
+            json.dumps({"resource": name, **{key: to_text(value) for key, value in row.items()}}) + "\n"
+            for row in rows
+        )
+
+def csv_chunks(user_id: int, since: datetime | None):
+    columns = ["resource"] + export_columns()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+    writer.writeheader()
+    yield buffer.getvalue()
+    for name, rows in stream_rows(user_id, since):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows({"resource": name, **{key: to_text(value) for key, value in row.items()}} for row in rows)
+        yield buffer.getvalue()
+
+@router.get("/export")
+def export_user_data(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    since: datetime | None = None,
+    current_user: User = Depends(get_current_user),
+):
+    if since is not None and since.tzinfo is not None:
+        # Las fechas se guardan en UTC sin zona horaria
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    chunks = ndjson_chunks if export_format == "ndjson" else csv_chunks
+    return StreamingResponse(
+        chunks(current_user.user_id, since),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="export.{export_format}"'},
+    )
@@ -0,0 +1,47 @@
+from datetime import date, datetime, time, timedelta
+from fastapi import APIRouter, Depends, Query, Response
+from typing import List
+from sqlalchemy import select, union_all
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models import User, UserMovements as UserMovementsModel, UserMovementsArchive as ArchiveModel
+from ..routers.auth import get_current_user
+from ..core.pagination import LIST_PAGE_SIZE, LIST_MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate, split_page
+from ..pydantic_models import UserMovements
+from .resources import ListFilters
+
+# Historial de movimientos del usuario, del más reciente al más antiguo. Lee a la vez
+# la tabla activa y el archivo (app/core/retention.py): cada una aporta su página por
+# (user_id, created_at) y se mezclan con UNION ALL.
+
+router = APIRouter()
+
+def tier_page(model, user_id: int, filters: ListFilters):
+    stmt = select(model.movement_id, model.user_id, model.description, model.created_at).where(model.user_id == user_id)
+    if filters.date_from is not None:
+        stmt = stmt.where(model.created_at >= datetime.combine(filters.date_from, time.min))
+    if filters.date_to is not None:
+        stmt = stmt.where(model.created_at < datetime.combine(filters.date_to + timedelta(days=1), time.min))
+    # Subconsulta: SQLite no admite ORDER BY/LIMIT en cada rama de un UNION
+    return select(paginate(stmt, model.created_at, model.movement_id, filters.cursor, filters.limit, descending=True).subquery())
+
+def movements_statement(user_id: int, filters: ListFilters):
+    page = union_all(tier_page(UserMovementsModel, user_id, filters), tier_page(ArchiveModel, user_id, filters)).subquery()
+    return select(page).order_by(page.c.created_at.desc(), page.c.movement_id.desc()).limit(filters.limit + 1)
+
+@router.get("/movements", response_model=List[UserMovements])
+def read_movements(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(LIST_PAGE_SIZE, ge=1, le=LIST_MAX_PAGE_SIZE),
+    date_from: date | None = None,
+    date_to: date | None = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    filters = ListFilters(cursor=cursor, limit=limit, date_from=date_from, date_to=date_to, amount_min=None, amount_max=None, name_prefix=None)
+    rows = db.execute(movements_statement(current_user.user_id, filters)).mappings().all()
+    rows, next_cursor = split_page(rows, limit, lambda row: (row["created_at"], row["movement_id"]))
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return rows
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Literal
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models import User
+from ..routers.auth import get_current_user
+from ..core import debts, investments, forecast
+from ..core.admission import admit, COST_PROJECTION
+
+# Proyecciones calculadas sobre los datos del usuario; se monta dentro de /user
+# (router síncrono y asíncrono). Los handlers son síncronos: el cálculo con NumPy
+# se ejecuta en el threadpool y no bloquea el event loop.
+
+router = APIRouter()
+
+@router.get("/debts/projection", dependencies=[Depends(admit("projections.debts", COST_PROJECTION))])
+def debt_projection(
+    max_months: int = Query(debts.DEBT_PROJECTION_MAX_MONTHS, ge=1, le=1200),
+    schedule: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return debts.project_user(db, current_user.user_id, max_months, schedule)
+
+@router.get("/investments/projection", dependencies=[Depends(admit("projections.investments", COST_PROJECTION))])
+def investment_projection(
+    horizon_months: int = Query(120, ge=1, le=1200),
+    resolution: Literal["day", "week", "month", "quarter", "year"] = "month",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    step = investments.RESOLUTIONS[resolution]
+    horizon_days = horizon_months * debts.DAYS_PER_MONTH
+    if horizon_days // step + 1 > investments.INVESTMENT_PROJECTION_MAX_POINTS:
+        raise HTTPException(status_code=400, detail="err_too_many_points")
+    return investments.project_user(db, current_user.user_id, horizon_days, step)
+
+@router.get("/forecast", dependencies=[Depends(admit("projections.forecast", COST_PROJECTION))])
+def balance_forecast(
+    horizon_days: int = Query(365, ge=1, le=3650),
+    resolution: Literal["day", "week", "month", "quarter", "year"] = "week",
+    simulations: int = Query(1000, ge=1, le=forecast.FORECAST_MAX_SIMULATIONS),
+    seed: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    step = investments.RESOLUTIONS[resolution]
+    if forecast.too_many_cells(horizon_days, simulations):
+        raise HTTPException(status_code=400, detail="err_too_many_points")
+    return forecast.forecast_user(db, current_user.user_id, horizon_days, step, simulations, seed)
@@ -0,0 +1,154 @@
+from datetime import datetime, date, time, timedelta
+from decimal import Decimal
+from fastapi import Query
+from pydantic import TypeAdapter, create_model
+from sqlalchemy import Date, Numeric, select, func
+from typing_extensions import TypedDict
+from ..core.pagination import LIST_PAGE_SIZE, LIST_MAX_PAGE_SIZE, paginate
+from ..models import (
+    FixedIncome as FixedIncomeModel,
+    VariableIncome as VariableIncomeModel,
+    FixedExpense as FixedExpenseModel,
+    VariableExpense as VariableExpenseModel,
+    Saving as SavingModel,
+    Debt as DebtModel,
+    Goal as GoalModel,
+    FixedInvestment as FixedInvestmentModel,
+    VariableInvestment as VariableInvestmentModel,
+    UserMoney as UserMoneyModel,
+)
+from ..pydantic_models import (
+    FixedIncome, VariableIncome, FixedExpense, VariableExpense, Saving, Debt, Goal, FixedInvestment, VariableInvestment, UserMoney,
+    FixedIncomeCreate, VariableIncomeCreate, FixedExpenseCreate, VariableExpenseCreate, SavingCreate, DebtCreate, GoalCreate,
+    FixedInvestmentCreate, VariableInvestmentCreate, UserMoneyCreate,
+)
+
+class ListFilters:
+    # Parámetros comunes de los listados: paginación por cursor y filtros
+    def __init__(
+        self,
+        cursor: str | None = None,
+        limit: int | None = Query(None, ge=1, le=LIST_MAX_PAGE_SIZE),
+        date_from: date | None = None,
+        date_to: date | None = None,
+        amount_min: Decimal | None = None,
+        amount_max: Decimal | None = None,
+        name_prefix: str | None = Query(None, min_length=1, max_length=255),
+    ):
+        self.cursor = cursor
+        # Sin limit ni cursor se devuelve la lista completa, como antes de la paginación;
+        # con cursor y sin limit, páginas de LIST_PAGE_SIZE
+        self.limit = LIST_PAGE_SIZE if limit is None and cursor else limit
+        self.date_from = date_from
+        self.date_to = date_to
+        self.amount_min = amount_min
+        self.amount_max = amount_max
+        self.name_prefix = name_prefix
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+class Resource:
+    # Describe un recurso financiero del usuario expuesto bajo /user/{path}
+    def __init__(self, path: str, name: str, label: str, model, schema, create_schema, singleton: bool = False, date_field: str = "created_at"):
+        self.path = path
+        self.name = name
+        self.label = label
+        self.model = model
+        self.schema = schema
+        self.create_schema = create_schema
+        self.singleton = singleton
+        self.pk = model.__mapper__.primary_key[0]
+        self.id_name = self.pk.name
+        self.fields = list(create_schema.model_fields)
+        self.columns = {column.name: column for column in model.__table__.columns}
+        self.date_column = getattr(model, date_field)
+        # Listados sin hidratar entidades: columnas del esquema de respuesta (más el id
+        # para el cursor) serializadas con un TypeAdapter construido una sola vez
+        self.response_fields = list(schema.model_fields)
+        self.list_columns = [self.columns[field] for field in self.response_fields] + [self.pk]
+        row_type = TypedDict(f"{schema.__name__}Row", {field: info.annotation for field, info in schema.model_fields.items()})
+        self.list_adapter = TypeAdapter(list[row_type])
+        self.table_name = model.__tablename__
+        # Esquema de actualización masiva: el de creación más el id del recurso
+        self.bulk_update_schema = create_model(
+            f"{create_schema.__name__.removesuffix('Create')}BulkUpdate",
+            __base__=create_schema,
+            **{self.id_name: (int, ...)},
+        )
+
+    @property
+    def plural_label(self) -> str:
+        return self.path.replace("_", " ")
+
+    def values(self, payload) -> dict:
+        # Normaliza los valores como los devolvería la base de datos (DECIMAL con su escala, DATE sin hora)
+        values = payload.model_dump(include=set(self.fields))
+        for field, value in values.items():
+            column_type = self.columns[field].type
+            if value is None:
+                continue
+            if isinstance(column_type, Numeric) and column_type.scale is not None:
+                values[field] = Decimal(str(value)).quantize(Decimal(1).scaleb(-column_type.scale))
+            elif isinstance(column_type, Date) and isinstance(value, datetime):
+                values[field] = value.date()
+        return values
+
+    def owned(self, item_id: int | None, user_id: int) -> list:
+        # Condiciones para localizar una fila del usuario; en recursos únicos (user_money) es su primera fila
+        if self.singleton:
+            first_id = select(func.min(self.pk)).where(self.model.user_id == user_id).scalar_subquery()
+            return [self.pk == first_id]
+        return [self.pk == item_id, self.model.user_id == user_id]
+
+    def list_statement(self, user_id: int, filters: ListFilters, columns=None):
+        model = self.model
+        stmt = select(*columns) if columns is not None else select(model)
+        stmt = stmt.where(model.user_id == user_id, model.status == "active")
+        if filters.date_from is not None:
+            stmt = stmt.where(self.date_column >= self.date_bound(filters.date_from))
+        if filters.date_to is not None:
+            stmt = stmt.where(self.date_column < self.date_bound(filters.date_to + timedelta(days=1)))
+        if filters.amount_min is not None:
+            stmt = stmt.where(model.amount >= filters.amount_min)
+        if filters.amount_max is not None:
+            stmt = stmt.where(model.amount <= filters.amount_max)
+        if filters.name_prefix and hasattr(model, "name"):
+            stmt = stmt.where(model.name.like(escape_like(filters.name_prefix) + "%", escape="\\"))
+        return paginate(stmt, model.created_at, self.pk, filters.cursor, filters.limit)
+
+    def dump_list(self, rows) -> bytes:
+        return self.list_adapter.dump_json([dict(zip(self.response_fields, row)) for row in rows])
+
+    def date_bound(self, value: date):
+        # Las columnas TIMESTAMP se comparan con el inicio del día
+        if isinstance(self.date_column.type, Date):
+            return value
+        return datetime.combine(value, time.min)
+
+    def cursor_key(self, entity) -> tuple:
+        return entity.created_at, getattr(entity, self.id_name)
+
+    @property
+    def not_found(self) -> str:
+        return f"{self.label.capitalize()} not found"
+
+    def describe(self, action: str, entity) -> str:
+        if self.singleton:
+            return f"{action} {self.label}"
+        return f"{action} {self.label}: {entity.name}"
+
+RESOURCES = [
+    Resource("fixed_incomes", "fixed_income", "fixed income", FixedIncomeModel, FixedIncome, FixedIncomeCreate),
+    Resource("variable_incomes", "variable_income", "variable income", VariableIncomeModel, VariableIncome, VariableIncomeCreate, date_field="received_date"),
+    Resource("fixed_expenses", "fixed_expense", "fixed expense", FixedExpenseModel, FixedExpense, FixedExpenseCreate),
+    Resource("variable_expenses", "variable_expense", "variable expense", VariableExpenseModel, VariableExpense, VariableExpenseCreate, date_field="paid_date"),
+    Resource("savings", "saving", "saving", SavingModel, Saving, SavingCreate),
+    Resource("debts", "debt", "debt", DebtModel, Debt, DebtCreate),
+    Resource("goals", "goal", "goal", GoalModel, Goal, GoalCreate),
+    Resource("fixed_investments", "fixed_investment", "fixed investment", FixedInvestmentModel, FixedInvestment, FixedInvestmentCreate),
+    Resource("variable_investments", "variable_investment", "variable investment", VariableInvestmentModel, VariableInvestment, VariableInvestmentCreate, date_field="start_date"),
+    Resource("user_money", "user_money", "user money", UserMoneyModel, UserMoney, UserMoneyCreate, singleton=True),
+]
+
+RESOURCES_BY_PATH = {resource.path: resource for resource in RESOURCES}
@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
+from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from ..database import get_async_db
+from ..models import User
+from ..routers.auth import get_current_user
+from ..pydantic_models import BulkResult, UserFinancialSummary
+from ..core import summary, movements
+from .resources import Resource, ListFilters, RESOURCES
+from .conditional import conditional_get_async
+from .export import router as export_router
+from .projections import router as projections_router
+from .movements import router as movements_router
+from .user import bulk_create, bulk_update, limit_bulk_size, list_response, track_changes
+
+# Variante asíncrona de app/routers/user.py (DATABASE_ASYNC=true); mismas rutas y respuestas
+
+router = APIRouter()
+
+def add_user_movement(db: AsyncSession, user_id: int, description: str):
+    movements.record(db, user_id, description)
+
+async def get_entity(db: AsyncSession, resource: Resource, item_id: int | None, user_id: int):
+    stmt = select(resource.model).where(*resource.owned(item_id, user_id)).with_for_update()
+    entity = (await db.execute(stmt)).scalars().first()
+    if entity is None:
+        raise HTTPException(status_code=404, detail=resource.not_found)
+    return entity
+
+async def save(db: AsyncSession, resource: Resource, entity, user_id: int, action: str, old: dict | None = None):
+    await db.run_sync(track_changes, resource, user_id, old, summary.entity_values(entity))
+    add_user_movement(db, user_id, resource.describe(action, entity))
+    await db.commit()
+    return entity
+
+def add_bulk_routes(router: APIRouter, resource: Resource):
+    # Reutiliza la implementación síncrona sobre la misma conexión asíncrona
+    async def bulk_create_handler(items: List[resource.create_schema], db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+        return await db.run_sync(bulk_create, resource, current_user.user_id, items)
+
+    async def bulk_update_handler(items: List[resource.bulk_update_schema], db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+        return await db.run_sync(bulk_update, resource, current_user.user_id, items)
+
+    router.add_api_route(f"/{resource.path}/bulk", bulk_create_handler, methods=["POST"], response_model=BulkResult, name=f"bulk_create_{resource.path}", dependencies=[Depends(limit_bulk_size)])
+    router.add_api_route(f"/{resource.path}/bulk", bulk_update_handler, methods=["PUT"], response_model=BulkResult, name=f"bulk_update_{resource.path}", dependencies=[Depends(limit_bulk_size)])
+
+def add_routes(router: APIRouter, resource: Resource):
+    model = resource.model
+    item_path = f"/{resource.path}" if resource.singleton else f"/{resource.path}/{{{resource.id_name}}}"
+    item_id_param = Path(alias=resource.id_name)
+
+    if resource.singleton:
+        async def list_handler(response: Response, validators: dict = Depends(conditional_get_async(resource)), db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+            response.headers.update(validators)
+            stmt = select(model).where(model.user_id == current_user.user_id, model.status == "active").limit(1)
+            return (await db.execute(stmt)).scalars().first()
+        response_model = resource.schema
+    else:
+        async def list_handler(filters: ListFilters = Depends(), validators: dict = Depends(conditional_get_async(resource)), db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+            rows = (await db.execute(resource.list_statement(current_user.user_id, filters, resource.list_columns))).all()
+            return list_response(resource, rows, filters.limit, validators)
+        response_model = List[resource.schema]
+
+    async def create_handler(payload: resource.create_schema, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+        now = datetime.utcnow()
+        entity = model(user_id=current_user.user_id, **resource.values(payload), created_at=now, updated_at=now)
+        db.add(entity)
+        return await save(db, resource, entity, current_user.user_id, "Created")
+
+    async def update_item(item_id: int | None, payload, db: AsyncSession, current_user: User):
+        entity = await get_entity(db, resource, item_id, current_user.user_id)
+        old = summary.entity_values(entity)
+        for field, value in resource.values(payload).items():
+            setattr(entity, field, value)
+        entity.updated_at = datetime.utcnow()
+        return await save(db, resource, entity, current_user.user_id, "Updated", old)
+
+    async def delete_item(item_id: int | None, db: AsyncSession, current_user: User):
+        entity = await get_entity(db, resource, item_id, current_user.user_id)
+        old = summary.entity_values(entity)
+        entity.status = "inactive"
+        entity.updated_at = datetime.utcnow()
+        return await save(db, resource, entity, current_user.user_id, "Deleted", old)
+
+    if resource.singleton:
+        async def update_handler(payload: resource.create_schema, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+            return await update_item(None, payload, db, current_user)
+
+        async def delete_handler(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+            return await delete_item(None, db, current_user)
+    else:
+        async def update_handler(payload: resource.create_schema, item_id: int = item_id_param, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+            return await update_item(item_id, payload, db, current_user)
+
+        async def delete_handler(item_id: int = item_id_param, db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+            return await delete_item(item_id, db, current_user)
+
+    router.add_api_route(f"/{resource.path}", list_handler, methods=["GET"], response_model=response_model, name=f"get_{resource.path}")
+    router.add_api_route(f"/{resource.path}", create_handler, methods=["POST"], response_model=resource.schema, name=f"create_{resource.name}")
+    router.add_api_route(item_path, update_handler, methods=["PUT"], response_model=resource.schema, name=f"update_{resource.name}")
+    router.add_api_route(item_path, delete_handler, methods=["DELETE"], response_model=resource.schema, name=f"delete_{resource.name}")
+
+for resource in RESOURCES:
+    if not resource.singleton:
+        add_bulk_routes(router, resource)
+    add_routes(router, resource)
+
+@router.get("/summary", response_model=UserFinancialSummary)
+async def get_summary(db: AsyncSession = Depends(get_async_db), current_user: User = Depends(get_current_user)):
+    return await db.run_sync(summary.read_summary, current_user.user_id)
+
+router.include_router(export_router)
+router.include_router(projections_router)
+router.include_router(movements_router)
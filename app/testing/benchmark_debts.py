@@ -0,0 +1,66 @@
+import argparse
+import random
+import time
+from collections import namedtuple
+
+# Mide la proyección vectorizada de deudas (app/core/debts.py) sobre deudas sintéticas,
+# sin base de datos. Por defecto 100k deudas repartidas en usuarios de 1 a 8 deudas.
+#
+#   python -m app.testing.benchmark_debts --debts 100000
+
+DebtRow = namedtuple("DebtRow", "debt_id user_id name amount payment interest_rate interest_type interest_period_days interest_free_months")
+
+def synthetic_debts(count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    rows, user_id = [], 0
+    while len(rows) < count:
+        user_id += 1
+        for _ in range(min(rng.randint(1, 8), count - len(rows))):
+            amount = round(rng.uniform(100, 20000), 2)
+            rows.append(DebtRow(
+                debt_id=len(rows) + 1,
+                user_id=user_id,
+                name=f"debt {len(rows) + 1}",
+                amount=amount,
+                payment=round(amount * rng.uniform(0.02, 0.1), 2),
+                interest_rate=round(rng.uniform(0, 4), 2),
+                interest_type=rng.choice(("simple", "compound")),
+                interest_period_days=rng.choice((30, 30, 365)),
+                interest_free_months=rng.choice((0, 0, 0, 3, 6, 12)),
+            ))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--debts", type=int, default=100_000)
+    parser.add_argument("--max-months", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    from ..core import debts
+    import_seconds = time.perf_counter() - started
+
+    rows = synthetic_debts(args.debts, args.seed)
+    started = time.perf_counter()
+    arrays = debts.to_arrays(rows)
+    arrays_seconds = time.perf_counter() - started
+
+    timings = {}
+    for strategy in debts.STRATEGIES:
+        started = time.perf_counter()
+        result = debts.simulate(arrays, strategy, args.max_months)
+        timings[strategy] = time.perf_counter() - started
+        unpaid = int((result["months_to_payoff"] < 0).sum())
+        print(f"{strategy}: {timings[strategy]:.3f}s, {len(result['user_id'])} users, {unpaid} not paid off in {args.max_months} months")
+
+    started = time.perf_counter()
+    projections = debts.project(rows, args.max_months)
+    project_seconds = time.perf_counter() - started
+
+    print(f"debts: {len(rows)}, users: {len(projections)}")
+    print(f"import: {import_seconds:.3f}s, to_arrays: {arrays_seconds:.3f}s")
+    print(f"project (both strategies + response): {project_seconds:.3f}s, {len(rows) / project_seconds:,.0f} debts/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+# Compara la serialización de un listado de /user: entidades ORM validadas con el
+# response_model (como hace FastAPI) frente a tuplas de columnas con el TypeAdapter
+# del recurso. Comprueba además que los bytes de ambas respuestas son idénticos.
+#
+#   python -m app.testing.benchmark_list_serialization --rows 10000
+
+PATHS = ("fixed_incomes", "variable_investments")
+
+def seed(session: Session, resource, rows: int):
+    now = datetime(2024, 1, 1)
+    values = []
+    for i in range(rows):
+        row = {"user_id": 1, "name": f"{resource.label} ñ {i}", "amount": 100 + i / 100, "status": "active",
+               "created_at": now + timedelta(seconds=i), "updated_at": now + timedelta(seconds=i)}
+        if resource.path == "fixed_incomes":
+            row["frequency"] = 30
+        else:
+            row.update(interest_rate=3.5, interest_type="compound", interest_period_days=30,
+                       start_date=date(2024, 1, 1), end_date=None if i % 2 else date(2030, 1, 1))
+        values.append(row)
+    session.execute(insert(resource.model), values)
+    session.commit()
+
+def orm_response(session: Session, resource, filters, adapter) -> bytes:
+    # Camino anterior: entidades + validación from_attributes + JSONResponse
+    from fastapi.responses import JSONResponse
+
+    rows = session.execute(resource.list_statement(1, filters)).scalars().all()
+    content = adapter.dump_python(adapter.validate_python(rows[:filters.limit], from_attributes=True), mode="json")
+    return JSONResponse(content).body
+
+def column_response(session: Session, resource, filters) -> bytes:
+    from ..routers.user import list_response
+
+    rows = session.execute(resource.list_statement(1, filters, resource.list_columns)).all()
+    return list_response(resource, rows, filters.limit).body
+
+def timed(func, repeat: int) -> tuple[float, bytes]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = func()
+        best = min(best, time.perf_counter() - started)
+    return best, body
+
+def check(uri: str, rows: int, repeat: int) -> bool:
+    # app.database crea su engine al importarse
+    os.environ.setdefault("URI_DATABASE", uri)
+    from pydantic import TypeAdapter
+    from ..database.migrations import ensure_schema
+    from ..models import User
+    from ..routers.resources import ListFilters, RESOURCES_BY_PATH
+
+    engine = create_engine(uri)
+    ensure_schema(engine)
+    ok = True
+    with Session(engine) as session:
+        session.add(User(user_id=1, first_name="Bench", last_name="User", email="bench@example.com", password="-",
+                         role="user", status="active", created_at=datetime(2024, 1, 1), updated_at=datetime(2024, 1, 1)))
+        session.commit()
+        filters = ListFilters(cursor=None, limit=rows, date_from=None, date_to=None, amount_min=None, amount_max=None, name_prefix=None)
+        for path in PATHS:
+            resource = RESOURCES_BY_PATH[path]
+            seed(session, resource, rows)
+            adapter = TypeAdapter(list[resource.schema])
+            orm_seconds, orm_body = timed(lambda: orm_response(session, resource, filters, adapter), repeat)
+            column_seconds, column_body = timed(lambda: column_response(session, resource, filters), repeat)
+            identical = orm_body == column_body and len(json.loads(column_body)) == rows
+            ok &= identical
+            print(f"{path}: orm {rows / orm_seconds:,.0f} rows/s, columns {rows / column_seconds:,.0f} rows/s "
+                  f"({orm_seconds / column_seconds:.1f}x), {len(column_body):,} bytes, {'identical' if identical else 'DIFFERENT'}")
+    engine.dispose()
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--uri")
+    args = parser.parse_args()
+
+    if args.uri:
+        return check(args.uri, args.rows, args.repeat)
+    with tempfile.TemporaryDirectory() as tmp:
+        return check(f"sqlite:///{os.path.join(tmp, 'list.db')}", args.rows, args.repeat)
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,98 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+# Compara el router /user síncrono (threadpool) con el asíncrono (DATABASE_ASYNC=true).
+# Levanta un uvicorn por modo sobre una base SQLite local (aiosqlite en modo asíncrono).
+#
+#   python -m app.testing.benchmark_user_router --clients 300 --requests 10
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+def start_server(async_mode: bool, db_path: str):
+    env = dict(
+        os.environ,
+        URI_DATABASE=f"sqlite:///{db_path}",
+        DATABASE_ASYNC="true" if async_mode else "false",
+        SECRET_KEY=os.getenv("SECRET_KEY", "benchmark"),
+        PASSWORD_HASH_WORKERS="0",
+        BCRYPT_ROUNDS="4",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        env=env,
+    )
+    for _ in range(100):
+        try:
+            if requests.get(f"{BASE_URL}/").status_code == 200:
+                return server
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError("server did not start")
+
+def prepare(rows: int) -> dict:
+    response = requests.post(f"{BASE_URL}/auth/register", json={
+        "first_name": "Bench", "last_name": "User", "email": "bench@example.com", "password": "bench", "role": "user",
+    })
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    for i in range(rows):
+        requests.post(f"{BASE_URL}/user/fixed_incomes", headers=headers, json={"name": f"income {i}", "amount": 100 + i, "frequency": 30})
+    return headers
+
+def run_load(headers: dict, clients: int, per_client: int):
+    def client(_):
+        session = requests.Session()
+        latencies, errors = [], 0
+        for _ in range(per_client):
+            started = time.perf_counter()
+            try:
+                ok = session.get(f"{BASE_URL}/user/fixed_incomes", headers=headers).status_code == 200
+            except requests.RequestException:
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(client, range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for result in results for latency in result[0])
+    errors = sum(result[1] for result in results)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--requests", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=20)
+    args = parser.parse_args()
+
+    for async_mode in (False, True):
+        with tempfile.TemporaryDirectory() as tmp:
+            server = start_server(async_mode, os.path.join(tmp, "bench.db"))
+            try:
+                headers = prepare(args.rows)
+                result = run_load(headers, args.clients, args.requests)
+            finally:
+                server.terminate()
+                server.wait()
+        print("async" if async_mode else "threaded", result)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os
+import socket
+import tempfile
+from contextlib import contextmanager
+
+# Base de datos SQLite temporal y hasheo en el propio hilo; tiene que quedar configurado
+# antes de importar app (el engine se crea al importar app.database)
+TEST_DIR = tempfile.mkdtemp(prefix="easyoutlines-tests-")
+os.environ["URI_DATABASE"] = f"sqlite:///{os.path.join(TEST_DIR, 'test.db')}"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ["DATABASE_ASYNC"] = "false"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+os.environ["BCRYPT_ROUNDS"] = "4"
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["USER_MOVEMENTS_MODE"] = "strict"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class StatementCounter:
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+@contextmanager
+def count_statements(target=None):
+    counter = StatementCounter()
+
+    def before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        counter.statements.append(statement)
+
+    target = target if target is not None else engine
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+def register(client, email: str, role: str = "user") -> dict:
+    response = client.post("/auth/register", json={
+        "first_name": "Test",
+        "last_name": "User",
+        "email": email,
+        "password": "password123",
+        "role": role,
+    })
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    return register(client, "test.user@example.com")
@@ -0,0 +1,60 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select
+from app.core import cascade
+from app.database import SessionLocal
+from app.models import AdminJob, User
+from conftest import count_statements
+
+def register(client, email: str, role: str) -> tuple[int, dict]:
+    response = client.post("/auth/register", json={
+        "first_name": "Jobs", "last_name": "Test", "email": email, "password": "password123", "role": role,
+    })
+    assert response.status_code == 200
+    with SessionLocal() as db:
+        user_id = db.execute(select(User.user_id).where(User.email == email)).scalar()
+    return user_id, {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+@pytest.fixture(scope="module")
+def admin_headers(client):
+    return register(client, "jobs.admin@example.com", "admin")[1]
+
+def add_job(user_id: int, kind: str, status: str, age_seconds: float = 0) -> str:
+    started = datetime.utcnow() - timedelta(seconds=age_seconds)
+    job = AdminJob(job_id=uuid.uuid4().hex, kind=kind, user_id=user_id, status=status, created_at=started,
+                   started_at=started if status == "running" else None)
+    with SessionLocal() as db:
+        db.add(job)
+        db.commit()
+        return job.job_id
+
+def job_status(job_id: str) -> str:
+    with SessionLocal() as db:
+        return db.get(AdminJob, job_id).status
+
+def test_job_of_other_kind_conflicts(client, admin_headers):
+    user_id, _ = register(client, "jobs.conflict@example.com", "user")
+    job_id = add_job(user_id, "delete_user", "pending")
+
+    response = client.put(f"/admin/users/{user_id}/reactivate", headers=admin_headers)
+    assert response.status_code == 409
+    assert response.json()["detail"] == "err_job_in_progress"
+
+    response = client.delete(f"/admin/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 202
+    assert response.json()["job_id"] == job_id
+
+def test_stale_job_does_not_block(client, admin_headers):
+    user_id, _ = register(client, "jobs.stale@example.com", "user")
+    job_id = add_job(user_id, "delete_user", "running", cascade.ADMIN_JOB_STALE_SECONDS + 60)
+
+    response = client.delete(f"/admin/users/{user_id}", headers=admin_headers)
+    assert response.status_code == 200
+    assert job_status(job_id) == "failed"
+
+def test_background_threshold_is_one_query(client):
+    user_id, _ = register(client, "jobs.count@example.com", "user")
+    with SessionLocal() as db, count_statements() as counter:
+        assert cascade.exceeds_background_rows(db, user_id) is False
+    assert counter.count == 1
@@ -0,0 +1,42 @@
+from sqlalchemy import select
+from app.database import SessionLocal, engine
+from app.models import Goal
+from app.routers import user
+from app.routers.user import BULK_MAX_ITEMS
+
+def test_bulk_create_ids_follow_item_order(client, auth_headers):
+    items = [{"name": f"goal {index}", "amount": index + 1, "saved_amount": 0} for index in range(25)]
+    response = client.post("/user/goals/bulk", headers=auth_headers, json=items)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    ids = [result["id"] for result in results]
+    assert [result["index"] for result in results] == list(range(len(items)))
+
+    db = SessionLocal()
+    try:
+        names = dict(db.execute(select(Goal.goal_id, Goal.name).where(Goal.goal_id.in_(ids))).all())
+    finally:
+        db.close()
+    assert [names[item_id] for item_id in ids] == [item["name"] for item in items]
+
+def test_bulk_create_ids_without_returning(client, auth_headers, monkeypatch):
+    # Mismo camino que MySQL: INSERT sin RETURNING y lectura posterior de los ids
+    monkeypatch.setattr(engine.dialect, "insert_executemany_returning", False)
+    monkeypatch.setattr(user.chunks, "__defaults__", (10,))
+    items = [{"name": f"plain goal {index}", "amount": index + 1, "saved_amount": 0} for index in range(25)]
+    response = client.post("/user/goals/bulk", headers=auth_headers, json=items)
+    assert response.status_code == 200
+    ids = [result["id"] for result in response.json()["results"]]
+
+    db = SessionLocal()
+    try:
+        names = dict(db.execute(select(Goal.goal_id, Goal.name).where(Goal.goal_id.in_(ids))).all())
+    finally:
+        db.close()
+    assert [names[item_id] for item_id in ids] == [item["name"] for item in items]
+
+def test_bulk_size_checked_before_validation(client, auth_headers):
+    # Elementos inválidos: si se validaran antes, la respuesta sería 422
+    response = client.post("/user/goals/bulk", headers=auth_headers, json=[{}] * (BULK_MAX_ITEMS + 1))
+    assert response.status_code == 413
+    assert response.json()["detail"] == "err_bulk_too_many_items"
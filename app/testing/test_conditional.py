@@ -0,0 +1,47 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import select, update
+from app.core.accrual import run_accrual
+from app.database import SessionLocal
+from app.models import FixedIncome
+
+@pytest.fixture(scope="module")
+def headers(client):
+    response = client.post("/auth/register", json={
+        "first_name": "Conditional", "last_name": "Test", "email": "conditional@example.com",
+        "password": "password123", "role": "user",
+    })
+    assert response.status_code == 200
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.post("/user/user_money", headers=headers, json={"amount": 100}).status_code == 200
+    return headers
+
+def revalidate(client, headers: dict, etag: str):
+    return client.get("/user/fixed_incomes", headers=dict(headers, **{"If-None-Match": etag}))
+
+def test_accrual_changes_etag(client, headers):
+    client.post("/user/fixed_incomes", headers=headers, json={"name": "Weekly", "amount": 10, "frequency": 7})
+    client.post("/user/fixed_incomes", headers=headers, json={"name": "Recent", "amount": 20, "frequency": 30})
+    # El devengo mueve updated_at de esta fila a hace 3 días: por debajo del máximo del usuario
+    with SessionLocal() as db:
+        db.execute(update(FixedIncome).where(FixedIncome.name == "Weekly").values(updated_at=datetime.utcnow() - timedelta(days=10)))
+        db.commit()
+    before = client.get("/user/fixed_incomes", headers=headers)
+    assert revalidate(client, headers, before.headers["ETag"]).status_code == 304
+
+    with SessionLocal() as db:
+        assert run_accrual(db)["fixed_incomes_rows"] >= 1
+    after = revalidate(client, headers, before.headers["ETag"])
+    assert after.status_code == 200
+    assert after.json() != before.json()
+
+def test_edits_in_the_same_second_change_etag(client, headers):
+    etag = client.get("/user/fixed_incomes", headers=headers).headers["ETag"]
+    with SessionLocal() as db:
+        item_id = db.execute(select(FixedIncome.fixed_income_id).where(FixedIncome.name == "Weekly")).scalar()
+    for amount in (11, 12):
+        payload = {"name": "Weekly", "amount": amount, "frequency": 7}
+        assert client.put(f"/user/fixed_incomes/{item_id}", headers=headers, json=payload).status_code == 200
+        response = revalidate(client, headers, etag)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
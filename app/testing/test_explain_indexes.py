@@ -0,0 +1,74 @@
+import os
+from datetime import date, datetime
+import pytest
+from sqlalchemy import create_engine, select
+from app.core.pagination import LIST_PAGE_SIZE
+from app.database.migrations import ensure_schema
+from app.models import FixedIncome, FixedExpense, UserMovements, UserMovementsArchive, User
+from app.routers.resources import ListFilters, RESOURCES_BY_PATH
+from conftest import TEST_DIR
+
+# EXPLAIN de las consultas más frecuentes: cada una tiene que usar alguno de los índices
+# esperados. Por defecto sobre una base SQLite nueva; EXPLAIN_DATABASE_URI permite
+# revisar una base real (MySQL) con el mismo test.
+EXPLAIN_DATABASE_URI = os.getenv("EXPLAIN_DATABASE_URI")
+
+def filters(**kwargs) -> ListFilters:
+    values = dict(cursor=None, limit=LIST_PAGE_SIZE, date_from=None, date_to=None, amount_min=None, amount_max=None, name_prefix=None)
+    values.update(kwargs)
+    return ListFilters(**values)
+
+def hot_queries() -> list:
+    queries = []
+    for resource in RESOURCES_BY_PATH.values():
+        if resource.singleton:
+            stmt = select(resource.model).where(resource.model.user_id == 1, resource.model.status == "active")
+        else:
+            stmt = resource.list_statement(1, filters())
+        queries.append((f"list {resource.path}", stmt, {index.name for index in resource.model.__table__.indexes if "user" in index.name}))
+
+    for path, column in (("variable_incomes", "received"), ("variable_expenses", "paid")):
+        resource = RESOURCES_BY_PATH[path]
+        stmt = select(resource.model).where(
+            resource.model.user_id == 1, resource.model.status == "active",
+            resource.date_column >= date(2024, 1, 1), resource.date_column < date(2024, 2, 1),
+        )
+        queries.append((f"date range {path}", stmt, {f"ix_{path}_user_status_{column}"}))
+
+    # Lectura inicial del devengo (app.core.accrual.collect_due)
+    for model in (FixedIncome, FixedExpense):
+        pk = model.__mapper__.primary_key[0]
+        stmt = select(pk, model.user_id, model.frequency, model.updated_at).where(model.status == "active")
+        queries.append((f"accrual {model.__tablename__}", stmt, {f"ix_{model.__tablename__}_status_updated"}))
+
+    stmt = select(UserMovements).where(UserMovements.user_id == 1).order_by(UserMovements.created_at.desc()).limit(LIST_PAGE_SIZE)
+    queries.append(("movements", stmt, {"ix_user_movements_user_created"}))
+    stmt = select(UserMovementsArchive).where(UserMovementsArchive.user_id == 1).order_by(UserMovementsArchive.created_at.desc()).limit(LIST_PAGE_SIZE)
+    queries.append(("movements archive", stmt, {"ix_user_movements_archive_user_created"}))
+    stmt = select(User).where(User.created_at > datetime(2024, 1, 1)).order_by(User.created_at, User.user_id).limit(LIST_PAGE_SIZE)
+    queries.append(("admin users", stmt, {"ix_users_created_at"}))
+    return queries
+
+def used_indexes(connection, stmt) -> tuple[set, str]:
+    sql = str(stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True}))
+    if connection.dialect.name == "sqlite":
+        plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+        used = {word for detail in plan for word in detail.split() if word.startswith("ix_")}
+    else:
+        rows = connection.exec_driver_sql(f"EXPLAIN {sql}").mappings().all()
+        plan = [str(dict(row)) for row in rows]
+        used = {row["key"] for row in rows if row["key"]}
+    return used, "\n".join(plan)
+
+@pytest.fixture(scope="module")
+def connection():
+    engine = create_engine(EXPLAIN_DATABASE_URI or f"sqlite:///{os.path.join(TEST_DIR, 'explain.db')}")
+    ensure_schema(engine)
+    with engine.connect() as connection:
+        yield connection
+    engine.dispose()
+
+@pytest.mark.parametrize("name, stmt, expected", hot_queries(), ids=[name for name, _, _ in hot_queries()])
+def test_hot_query_uses_index(connection, name, stmt, expected):
+    used, plan = used_indexes(connection, stmt)
+    assert used & expected, f"{name} does not use {sorted(expected)}; plan:\n{plan}"
@@ -0,0 +1,36 @@
+import tracemalloc
+import numpy as np
+from app.core import forecast
+
+def test_histogram_percentiles_match_exact():
+    rng = np.random.default_rng(0)
+    sample = rng.gamma(2.0, 50.0, size=(5000, 3)) + np.array([0, 1000, -500])
+    low = sample.mean(axis=0) - 6 * sample.std(axis=0)
+    width = 12 * sample.std(axis=0) / forecast.FORECAST_HISTOGRAM_BINS
+    bins = np.clip(((sample - low) / width).astype(np.int64), 0, forecast.FORECAST_HISTOGRAM_BINS - 1)
+    histogram = np.stack([np.bincount(bins[:, point], minlength=forecast.FORECAST_HISTOGRAM_BINS) for point in range(3)])
+
+    bands = forecast.histogram_percentiles(histogram, low, width, len(sample))
+    exact = np.percentile(sample, forecast.PERCENTILES, axis=0)
+    assert np.all(np.abs(np.array(bands) - exact) <= width)
+
+def test_forecast_rejects_too_many_cells(client, auth_headers):
+    simulations = forecast.FORECAST_MAX_CELLS // 3650 + 1
+    response = client.get("/user/forecast", headers=auth_headers, params={
+        "horizon_days": 3650, "resolution": "day", "simulations": simulations,
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "err_too_many_points"
+
+def test_batch_memory_does_not_grow_with_event_rate(monkeypatch):
+    monkeypatch.setattr(forecast, "FORECAST_BATCH_EVENTS", 100000)
+    # 10 movimientos al día: 3,65 millones de eventos en el lote, unos 58 MB si se generaran de una vez
+    inputs = {"money": 500.0, "fixed": [], "variable": [(-1, 10.0, [5.0, 12.0, 40.0])]}
+    low, width = forecast.histogram_edges(inputs, 3650, 30)
+    tracemalloc.start()
+    try:
+        forecast.simulate_batch(inputs, 3650, 30, np.random.SeedSequence(0), 100, low, width)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 20 * 2**20
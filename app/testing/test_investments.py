@@ -0,0 +1,37 @@
+from datetime import date, datetime
+from types import SimpleNamespace
+from app.core import investments
+from app.core.cache import TTLCache
+
+TODAY = date(2026, 1, 1)
+
+def position(investment_id: int, interest_type: str = "compound") -> SimpleNamespace:
+    return SimpleNamespace(
+        kind="variable", investment_id=investment_id, name=f"fund {investment_id}", amount=1000, interest_rate=5,
+        interest_type=interest_type, interest_period_days=30, start_date=date(2025, 1, 1), end_date=None,
+        updated_at=datetime(2025, 6, 1),
+    )
+
+def test_shorter_horizon_reuses_cached_curve():
+    investments.curve_cache.clear()
+    rows = [position(1), position(2, "simple")]
+    long = investments.project(rows, 3650, 30, TODAY)
+    entries = investments.curve_cache.stats()["size"]
+
+    short = investments.project(rows, 365, 30, TODAY)
+    assert investments.curve_cache.stats()["size"] == entries
+    assert short["total"] == long["total"][:short["points"]]
+
+    # Un horizonte más largo sustituye la curva guardada, no añade otra entrada
+    investments.project(rows, 7300, 30, TODAY)
+    assert investments.curve_cache.stats()["size"] == entries
+
+def test_cache_is_bounded_in_bytes():
+    cache = TTLCache(maxsize=100, ttl=60, maxbytes=1000, sizeof=len)
+    for key in range(10):
+        cache.set(key, b"x" * 300)
+    stats = cache.stats()
+    assert stats["bytes"] <= 1000
+    assert stats["size"] == 3
+    cache.set("too big", b"x" * 2000)
+    assert cache.get("too big") is None
@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+from sqlalchemy.dialects import mysql
+from app.core import leader
+from app.database import SessionLocal
+from app.models import SchedulerLease
+
+def test_acquired_at_is_set_before_holder_on_mysql():
+    now = datetime(2026, 1, 1)
+    sql = str(leader.acquire_statement("scheduler", "me", now, now).compile(dialect=mysql.dialect()))
+    assignments = sql.split(" SET ", 1)[1]
+    assert assignments.index("acquired_at=") < assignments.index("holder=")
+
+def test_takeover_resets_acquired_at_and_renewal_keeps_it(client):
+    expired = datetime.utcnow() - timedelta(hours=1)
+    with SessionLocal() as db:
+        db.add(SchedulerLease(name="test-takeover", holder="previous", acquired_at=expired - timedelta(days=1),
+                              heartbeat_at=expired, expires_at=expired))
+        db.commit()
+
+    assert leader.try_acquire("test-takeover")
+    status = leader.lease_status("test-takeover")
+    assert status["is_leader"]
+    assert status["acquired_at"] > expired
+
+    assert leader.try_acquire("test-takeover")
+    assert leader.lease_status("test-takeover")["acquired_at"] == status["acquired_at"]
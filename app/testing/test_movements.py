@@ -0,0 +1,47 @@
+import pytest
+from sqlalchemy import select, func
+from app.core import movements
+from app.database import SessionLocal
+from app.models import User, UserMovements
+from conftest import register
+
+@pytest.fixture
+def write_behind(monkeypatch):
+    monkeypatch.setattr(movements, "USER_MOVEMENTS_MODE", "write_behind")
+    yield
+    movements.writer.stop()
+
+def user_id_for(email: str) -> int:
+    with SessionLocal() as db:
+        return db.execute(select(User.user_id).where(User.email == email)).scalar()
+
+def movement_count(user_id: int, description: str | None = None) -> int:
+    stmt = select(func.count()).select_from(UserMovements).where(UserMovements.user_id == user_id)
+    if description is not None:
+        stmt = stmt.where(UserMovements.description == description)
+    with SessionLocal() as db:
+        return db.execute(stmt).scalar()
+
+def test_commit_writes_one_movement(client, write_behind):
+    # Usuario nuevo: la primera escritura crea resumen, momentos y versión con SAVEPOINT
+    headers = register(client, "movements.commit@example.com")
+    user_id = user_id_for("movements.commit@example.com")
+    before = movement_count(user_id)
+    assert client.post("/user/savings", headers=headers, json={"name": "Rainy day", "amount": 40}).status_code == 200
+
+    movements.writer.stop()
+    assert movement_count(user_id) == before + 1
+
+def test_rollback_writes_no_movement(client, write_behind):
+    register(client, "movements.rollback@example.com")
+    user_id = user_id_for("movements.rollback@example.com")
+    with SessionLocal() as db:
+        movements.record(db, user_id, "rolled back")
+        with db.begin_nested():
+            movements.record(db, user_id, "rolled back")
+        db.rollback()
+        # La sesión sigue en uso: una transacción posterior no arrastra los pendientes
+        db.commit()
+
+    movements.writer.stop()
+    assert movement_count(user_id, "rolled back") == 0
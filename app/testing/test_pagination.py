@@ -0,0 +1,23 @@
+from app.core.pagination import LIST_PAGE_SIZE, NEXT_CURSOR_HEADER
+
+def test_list_without_limit_or_cursor_is_complete(client, auth_headers):
+    total = LIST_PAGE_SIZE + 20
+    items = [{"name": f"saving {index}", "amount": 1} for index in range(total)]
+    assert client.post("/user/savings/bulk", headers=auth_headers, json=items).status_code == 200
+
+    response = client.get("/user/savings", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) >= total
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+def test_list_pages_with_limit_and_cursor(client, auth_headers):
+    complete = client.get("/user/savings", headers=auth_headers).json()
+    assert len(complete) > LIST_PAGE_SIZE
+
+    first = client.get("/user/savings", headers=auth_headers, params={"limit": 10})
+    assert len(first.json()) == 10
+    cursor = first.headers[NEXT_CURSOR_HEADER]
+
+    # Con cursor y sin limit: páginas de LIST_PAGE_SIZE
+    second = client.get("/user/savings", headers=auth_headers, params={"cursor": cursor})
+    assert second.json() == complete[10:10 + LIST_PAGE_SIZE]
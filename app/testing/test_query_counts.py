@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import select, func
+from app.database import SessionLocal
+from app.routers.resources import RESOURCES
+from conftest import count_statements
+
+# Sentencias SQL por petición en régimen estable (con el principal ya en caché y las
+# filas de resumen, momentos y versión ya creadas). Una subida indica una consulta de más en la
+# capa genérica de recursos.
+BUDGETS = {"create": 5, "update": 4, "list": 2, "delete": 8}
+SINGLETON_BUDGETS = {"create": 4, "update": 5, "list": 2, "delete": 5}
+
+PAYLOADS = {
+    "fixed_incomes": {"name": "Salary", "amount": 1000, "frequency": 30},
+    "variable_incomes": {"name": "Bonus", "amount": 50, "received_date": "2026-01-15T00:00:00"},
+    "fixed_expenses": {"name": "Rent", "amount": 400, "frequency": 30},
+    "variable_expenses": {"name": "Dinner", "amount": 25, "paid_date": "2026-01-20T00:00:00"},
+    "savings": {"name": "Emergency", "amount": 100},
+    "debts": {"name": "Loan", "amount": 1000, "payment": 100, "interest_rate": 5, "interest_type": "compound", "interest_period_days": 30, "interest_free_months": 0},
+    "goals": {"name": "Trip", "amount": 500, "saved_amount": 50},
+    "fixed_investments": {"name": "Deposit", "amount": 1000, "interest_rate": 3, "interest_type": "simple", "interest_period_days": 30, "start_date": "2026-01-01T00:00:00", "end_date": "2027-01-01T00:00:00"},
+    "variable_investments": {"name": "Fund", "amount": 1000, "interest_rate": 6, "interest_type": "compound", "interest_period_days": 30, "start_date": "2026-01-01T00:00:00", "end_date": "2030-01-01T00:00:00"},
+    "user_money": {"amount": 250},
+}
+
+def last_id(resource) -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.max(resource.pk))).scalar()
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("resource", RESOURCES, ids=lambda resource: resource.path)
+def test_statements_per_endpoint(client, auth_headers, resource):
+    budgets = SINGLETON_BUDGETS if resource.singleton else BUDGETS
+    collection = f"/user/{resource.path}"
+    payload = PAYLOADS[resource.path]
+
+    # Primera escritura del recurso: crea las filas de agregados del usuario
+    assert client.post(collection, headers=auth_headers, json=payload).status_code == 200
+
+    with count_statements() as created:
+        assert client.post(collection, headers=auth_headers, json=payload).status_code == 200
+    item = collection if resource.singleton else f"{collection}/{last_id(resource)}"
+    with count_statements() as updated:
+        assert client.put(item, headers=auth_headers, json=payload).status_code == 200
+    with count_statements() as listed:
+        assert client.get(collection, headers=auth_headers).status_code == 200
+    with count_statements() as deleted:
+        assert client.delete(item, headers=auth_headers).status_code == 200
+
+    counts = {"create": created.count, "update": updated.count, "list": listed.count, "delete": deleted.count}
+    over = {operation: count for operation, count in counts.items() if count > budgets[operation]}
+    assert not over, f"{resource.path}: {counts} over budget {budgets}"
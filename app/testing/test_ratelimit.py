@@ -0,0 +1,60 @@
+import os
+import subprocess
+import sys
+import time
+import httpx
+import pytest
+from conftest import TEST_DIR, free_port
+
+# Limitador real en un proceso aparte: se configura por entorno al importar la aplicación
+USER_LIMIT = 3
+
+@pytest.fixture(scope="module")
+def server():
+    port = free_port()
+    env = dict(
+        os.environ,
+        URI_DATABASE=f"sqlite:///{os.path.join(TEST_DIR, 'ratelimit.db')}",
+        RATE_LIMIT_ENABLED="true",
+        USER_RATE_LIMIT=f"{USER_LIMIT}/minute",
+        AUTH_RATE_LIMIT="100/minute",
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"], env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                if httpx.get(f"{base_url}/", timeout=1).status_code == 200:
+                    break
+            except httpx.TransportError:
+                time.sleep(0.05)
+        else:
+            pytest.fail("server did not start")
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait()
+
+def register_remote(base_url: str, email: str) -> dict:
+    response = httpx.post(f"{base_url}/auth/register", json={
+        "first_name": "Rate", "last_name": "Limit", "email": email, "password": "password123", "role": "user",
+    })
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_limit_is_per_user_with_retry_after(server):
+    first = register_remote(server, "ratelimit.first@example.com")
+    second = register_remote(server, "ratelimit.second@example.com")
+
+    for _ in range(USER_LIMIT):
+        assert httpx.get(f"{server}/user/summary", headers=first).status_code == 200
+    rejected = httpx.get(f"{server}/user/summary", headers=first)
+    assert rejected.status_code == 429
+    assert rejected.json()["detail"] == "err_rate_limited"
+    assert 1 <= int(rejected.headers["Retry-After"]) <= 60
+
+    # Otro usuario desde la misma IP conserva su propio cupo
+    assert httpx.get(f"{server}/user/summary", headers=second).status_code == 200
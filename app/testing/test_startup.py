@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import time
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from app.database import migrations
+from conftest import TEST_DIR, count_statements, free_port
+
+# Presupuesto de arranque: tiempo desde lanzar uvicorn hasta el primer 200 en "/" (en
+# frío crea el esquema; en caliente solo comprueba la huella) y ningún módulo numérico
+# pesado cargado al importar la aplicación.
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "5"))
+HEAVY_MODULES = ("numpy", "scipy", "sklearn", "pandas")
+
+def server_environment(db_path: str) -> dict:
+    return dict(
+        os.environ,
+        URI_DATABASE=f"sqlite:///{db_path}",
+        PASSWORD_HASH_WORKERS="0",
+        BCRYPT_ROUNDS="4",
+    )
+
+def time_to_first_200(env: dict, timeout: float) -> float:
+    port = free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                if httpx.get(f"http://127.0.0.1:{port}/", timeout=1).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            if server.poll() is not None:
+                pytest.fail(f"server exited with code {server.returncode}")
+            time.sleep(0.01)
+        pytest.fail("server did not start")
+    finally:
+        server.terminate()
+        server.wait()
+
+def test_cold_and_warm_start_within_budget():
+    env = server_environment(os.path.join(TEST_DIR, "startup.db"))
+    timings = [time_to_first_200(env, timeout=STARTUP_BUDGET_SECONDS * 10) for _ in range(3)]
+    assert max(timings) <= STARTUP_BUDGET_SECONDS, f"startup {timings} over {STARTUP_BUDGET_SECONDS}s"
+
+def test_no_heavy_modules_at_import():
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    )
+    env = server_environment(os.path.join(TEST_DIR, "import.db"))
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == ""
+
+def test_warm_schema_check_is_one_lookup():
+    engine = create_engine(f"sqlite:///{os.path.join(TEST_DIR, 'schema.db')}")
+    assert migrations.ensure_schema(engine) is True
+    # Otro proceso: la huella ya registrada se comprueba con una consulta por clave primaria
+    migrations._verified.clear()
+    with count_statements(engine) as counter:
+        assert migrations.ensure_schema(engine) is False
+    engine.dispose()
+    assert counter.count == 1
@@ -0,0 +1,94 @@
+from datetime import datetime
+import numpy as np
+import pytest
+from sqlalchemy import select
+from app.core import moments
+from app.database import SessionLocal
+from app.models import TrendMoments, User, VariableIncome
+from conftest import register
+
+def test_rows_with_the_same_timestamp_have_no_trend(client):
+    headers = register(client, "trend.same@example.com")
+    # /bulk: todas las filas con el mismo created_at
+    items = [{"name": f"saving {index}", "amount": 50 + index * 10} for index in range(12)]
+    assert client.post("/user/savings/bulk", headers=headers, json=items).status_code == 200
+
+    response = client.get("/analysis/savings", headers=headers, params={"axis": "time"})
+    assert response.status_code == 422
+    stats = client.get("/analysis/savings/stats", headers=headers).json()
+    assert stats["count"] == 12
+    assert stats["slope_per_day"] is None
+
+def test_rows_created_moments_apart_have_no_trend(client):
+    headers = register(client, "trend.close@example.com")
+    for index in range(10):
+        response = client.post("/user/debts", headers=headers, json={
+            "name": f"debt {index}", "amount": 1000 - index * 37, "payment": 10, "interest_rate": 5,
+            "interest_type": "simple", "interest_period_days": 30, "interest_free_months": 0,
+        })
+        assert response.status_code == 200
+    assert client.get("/analysis/debts", headers=headers, params={"axis": "time"}).status_code == 422
+    assert client.get("/analysis/debts/stats", headers=headers).json()["slope_per_day"] is None
+
+def test_incremental_moments_match_recompute(client):
+    headers = register(client, "trend.drift@example.com")
+    for day in (3, 9, 9, 17, 28):
+        payload = {"name": f"income {day}", "amount": 100 + day, "received_date": f"2026-01-{day:02d}T00:00:00"}
+        assert client.post("/user/variable_incomes", headers=headers, json=payload).status_code == 200
+    with SessionLocal() as db:
+        user_id = db.execute(select(User.user_id).where(User.email == "trend.drift@example.com")).scalar()
+        first, last = db.execute(
+            select(VariableIncome.variable_income_id).where(VariableIncome.user_id == user_id).order_by(VariableIncome.received_date)
+        ).scalars().all()[::4]
+
+    # Cambio de fecha de negocio y baja de la primera fila: first_at se recalcula
+    payload = {"name": "moved", "amount": 140, "received_date": "2026-02-02T00:00:00"}
+    assert client.put(f"/user/variable_incomes/{last}", headers=headers, json=payload).status_code == 200
+    assert client.delete(f"/user/variable_incomes/{first}", headers=headers).status_code == 200
+
+    with SessionLocal() as db:
+        _, drift = moments.find_drift(db, user_id)
+        row = db.get(TrendMoments, (user_id, "variable_incomes"))
+    assert drift == []
+    assert (row.first_at, row.last_at) == (datetime(2026, 1, 9), datetime(2026, 2, 2))
+
+def parse_equation(equation: str) -> tuple[float, float]:
+    slope, intercept = equation.removeprefix("y = ").split("x + ")
+    return float(slope), float(intercept)
+
+def expense_dataset(client, email: str, days: list) -> dict:
+    headers = register(client, email)
+    items = [
+        {"name": f"expense {index}", "amount": round(20 + 3.7 * index + (index % 4) * 11.25, 2), "paid_date": f"2026-03-{day:02d}T00:00:00"}
+        for index, day in enumerate(days)
+    ]
+    assert client.post("/user/variable_expenses/bulk", headers=headers, json=items).status_code == 200
+    return headers, items
+
+@pytest.mark.parametrize("days", [
+    [1, 3, 4, 4, 8, 11, 12, 15, 19, 22, 25, 30],
+    [10, 10, 10, 11, 10, 11, 11, 10, 11, 10],
+], ids=["month", "two days"])
+def test_trend_matches_ols(client, days):
+    headers, items = expense_dataset(client, f"trend.ols.{len(days)}@example.com", days)
+    amounts = np.array([item["amount"] for item in items])
+    # Eje índice: orden de created_at y id, el de inserción; eje tiempo: días desde el primero
+    expected = {
+        "index": np.polyfit(np.arange(len(items)), amounts, 1),
+        "time": np.polyfit(np.array(days) - min(days), amounts, 1),
+    }
+    for axis, (slope, intercept) in expected.items():
+        response = client.get("/analysis/variable_expenses", headers=headers, params={"axis": axis})
+        assert response.status_code == 200
+        assert parse_equation(response.json()["trend_equation"]) == pytest.approx((slope, intercept), abs=0.006)
+
+    stats = client.get("/analysis/variable_expenses/stats", headers=headers).json()
+    assert stats["slope_per_day"] == pytest.approx(expected["time"][0], rel=1e-9)
+    assert stats["intercept"] == pytest.approx(expected["time"][1], rel=1e-9)
+
+def test_same_day_rows_trend_only_by_index(client):
+    headers, items = expense_dataset(client, "trend.ols.sameday@example.com", [5] * 10)
+    slope, intercept = np.polyfit(np.arange(len(items)), [item["amount"] for item in items], 1)
+    response = client.get("/analysis/variable_expenses", headers=headers, params={"axis": "index"})
+    assert parse_equation(response.json()["trend_equation"]) == pytest.approx((slope, intercept), abs=0.006)
+    assert client.get("/analysis/variable_expenses", headers=headers, params={"axis": "time"}).status_code == 422